@@ -0,0 +1 @@
+# Shared helpers for the CO2 emissions chart scripts
@@ -0,0 +1,3 @@
+from co2viz.app import main
+
+main()
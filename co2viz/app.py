@@ -0,0 +1,469 @@
+"""Single entry point for all CO2 views.
+
+    python -m co2viz continent
+    python -m co2viz map-years --years 1950 1970 1990 2010 --columns 2
+    python -m co2viz all
+    python -m co2viz export --out images
+
+The dataset, the ISO table and the derived stores are loaded once per run
+(see Session) and shared by every view that is opened.
+"""
+import argparse
+import os
+import sys
+
+from co2viz.timing import stage
+
+# Default location of the dataset; duplicated from co2viz.data so --help does not import pandas
+DEFAULT_PATH = 'owid-co2-data.csv'
+
+# Environment variable read when no license key is passed explicitly
+LICENSE_ENV = 'LIGHTNINGCHART_LICENSE'
+
+# Columns loaded for each view; views not listed load every cached column the CSV has
+VIEW_COLUMNS = {
+    'continent': ['country', 'year', 'co2'],
+    'region': ['country', 'year', 'co2'],
+    'entities': ['country', 'year', 'co2'],
+    'three-types': ['country', 'year', 'co2', 'co2_including_luc', 'land_use_change_co2'],
+    'map-years': ['country', 'year', 'co2'],
+    'map-per-capita': ['country', 'year', 'co2', 'co2_per_capita'],
+    'top-emitters': ['country', 'year', 'co2', 'co2_per_capita'],
+}
+
+
+def set_license(license_key=None):
+    with stage('import', 'chart backend'):
+        from co2viz.backend import get_backend
+
+        backend = get_backend()
+
+    license_key = license_key or os.environ.get(LICENSE_ENV)
+    if license_key:
+        backend.set_license(license_key)
+
+
+def _import_charts():
+    # The chart builders (and the chart backend) are only imported once a view is shown
+    if 'co2viz.charts' not in sys.modules:
+        with stage('import', 'co2viz.charts'):
+            import co2viz.charts
+    return sys.modules['co2viz.charts']
+
+
+class Session:
+    """The dataset and the lookup structures derived from it, built on first use.
+
+    With ``chunksize``, the CSV is streamed and aggregated per (country,
+    year) by load_chunked() instead of going through the column cache, for
+    inputs too large for memory or with several rows per country and year;
+    ``aggregations`` maps columns to 'sum' or 'mean' as in load_chunked().
+    """
+
+    def __init__(self, path=DEFAULT_PATH, columns=None, chunksize=None, aggregations=None):
+        with stage('import', 'numpy + pandas'):
+            from co2viz.data import CACHED_COLUMNS, load_chunked, load_dataset
+        self.path = path
+        self.columns = CACHED_COLUMNS if columns is None else columns
+        self.chunksize = chunksize
+        self.aggregations = aggregations or {}
+        with stage('load', 'dataset'):
+            if chunksize:
+                self.data = load_chunked(path, columns=self.columns, chunksize=chunksize, aggregations=self.aggregations)
+            else:
+                self.data = load_dataset(path, columns=self.columns)
+        self._resolver = None
+        self._store = None
+        self._regions = None
+        self._rankings = {}
+        self._palettes = None
+
+    @property
+    def resolver(self):
+        if self._resolver is None:
+            from co2viz.iso import get_resolver
+
+            with stage('transform', 'ISO table'):
+                self._resolver = get_resolver(data_path=self.path).build(self.data['country'].cat.categories)
+        return self._resolver
+
+    @property
+    def store(self):
+        if self._store is None:
+            from co2viz.pivot import PivotStore
+
+            resolver = self.resolver
+            with stage('transform', 'pivot store'):
+                metrics = [metric for metric in ('co2', 'co2_per_capita') if metric in self.data]
+                self._store = PivotStore(self.data, metrics=metrics, resolver=resolver)
+        return self._store
+
+    @property
+    def regions(self):
+        if self._regions is None:
+            from co2viz.regions import RegionAggregator
+
+            self._regions = RegionAggregator(self.data)
+        return self._regions
+
+    @property
+    def palettes(self):
+        """Data-driven map palettes, cached per (metric, year range, scale)."""
+        if self._palettes is None:
+            from co2viz.palette import PaletteBuilder
+
+            self._palettes = PaletteBuilder(self.store)
+        return self._palettes
+
+    def refresh(self):
+        """Reload the dataset after the CSV changed, applying only the differences.
+
+        The pivot store is patched in place; the region totals and rankings
+        are rebuilt on next use. Returns (changes, store_changes) for the
+        LineUpdater and MapUpdater of the open charts.
+        """
+        from co2viz.refresh import diff_frames, refresh_dataset
+
+        with stage('load', 'refresh'):
+            if self.chunksize:
+                from co2viz.data import load_chunked
+
+                # Chunked inputs are not cached; the new aggregate is compared with the one in memory
+                data = load_chunked(self.path, columns=self.columns, chunksize=self.chunksize,
+                                    aggregations=self.aggregations)
+                self.data, changes = data, diff_frames(self.data, data, self.columns)
+            else:
+                self.data, changes = refresh_dataset(self.path, self.columns)
+        store_changes = {}
+        if len(changes):
+            if self._resolver is not None:
+                self._resolver.build(self.data['country'].cat.categories)
+            if self._store is not None:
+                with stage('transform', 'pivot store update'):
+                    store_changes = self._store.apply(changes)
+            self._regions = None
+            self._rankings = {}
+            self._palettes = None
+        return changes, store_changes
+
+    def ranking(self, n=30):
+        """Top-``n`` index of every year and metric of the pivot store."""
+        if n not in self._rankings:
+            from co2viz.ranking import RankingIndex
+
+            store = self.store
+            with stage('transform', f'top {n} ranking'):
+                self._rankings[n] = RankingIndex(store, n=n)
+        return self._rankings[n]
+
+
+def show_continent(session, animate=False):
+    charts = _import_charts()
+    from co2viz.series import add_series_data
+
+    with stage('chart', 'continent'):
+        chart, line_series_dict, series = charts.continent_chart(session.data, regions=session.regions)
+    chart.open(live=True)
+    add_series_data(line_series_dict, series, per_point=animate)
+    chart.close()
+
+
+def _print_panel_timings():
+    from co2viz import dashboard, timing
+
+    if timing.is_enabled():
+        print(dashboard.report())
+
+
+def _watch(session, updaters, interval):
+    """Apply every refresh of the session's CSV to the open charts until Ctrl+C."""
+    from co2viz.refresh import watch
+
+    def on_change():
+        changes, store_changes = session.refresh()
+        sent = sum(updater.apply(changes, store_changes) for updater in updaters)
+        print(f"{session.path} changed: {changes.report()}; {sent} points/regions sent")
+
+    print(f"Watching {session.path} for changes every {interval:g} s (Ctrl+C to stop)")
+    watch(session.path, on_change, interval)
+
+
+def show_region(session, animate=True, years_per_second=20, watch=None):
+    charts = _import_charts()
+    from co2viz.playback import Playback
+    from co2viz.refresh import LineUpdater
+    from co2viz.series import add_series_data
+
+    with stage('chart', 'region'):
+        chart, line_series_dict, series = charts.region_chart(session.data)
+    chart.open(live=True)
+    if animate:
+        # Stream the data year by year at a fixed rate to simulate real-time drawing
+        playback = Playback(line_series_dict, series, years_per_second=years_per_second)
+        playback.run()
+        print(playback.report())
+    else:
+        add_series_data(line_series_dict, series)
+    if watch:
+        _watch(session, [LineUpdater(line_series_dict, series, 'co2', scale=1e6)], watch)
+    chart.close()
+
+
+def show_entities(session, monthly=False, pixels=None, method='minmax'):
+    charts = _import_charts()
+    with stage('chart', 'entities'):
+        chart, lod_view = charts.entities_chart(session.data, monthly=monthly, pixels=pixels or charts.DEFAULT_PIXELS,
+                                                method=method)
+    chart.open(live=True)
+    lod_view.show_all()
+    lod_view.attach()
+    if sys.stdin.isatty():
+        # Zoom events are handled while the chart stays open
+        input('Zoom the x axis to load more detail; press Enter to close the chart. ')
+    print(lod_view.report())
+    chart.close()
+
+
+def show_three_types(session):
+    charts = _import_charts()
+    with stage('chart', 'three types'):
+        chart = charts.three_types_chart(session.data)
+    chart.open()
+
+
+def show_map_years(session, years=(1990, 2000, 2010, 2022), columns=2, animate=False, watch=None, palette='fixed',
+                   workers=1):
+    charts = _import_charts()
+    store = session.store
+
+    if not animate:
+        with stage('chart', 'map years'):
+            dashboard, panels = charts.map_years_panels(session.data, years, columns=columns, store=store,
+                                                        palette=palette, palettes=session.palettes, workers=workers)
+        _print_panel_timings()
+        dashboard.open(live=True)
+        if watch:
+            from co2viz.refresh import MapUpdater
+
+            _watch(session, [MapUpdater(chart, store, year, metric) for chart, year, metric in panels], watch)
+        return
+
+    from co2viz.backend import get_backend
+    from co2viz.map_animation import MapAnimation
+
+    # One map updated year by year with only the regions that changed, under one palette for all years
+    with stage('chart', 'animated map'):
+        backend = get_backend()
+        chart = backend.map_chart()
+        steps = charts.map_palette_steps(store, 'co2', store.years, palette, charts.CO2_PALETTE, session.palettes, backend)
+        chart.set_palette_colors(steps=steps, look_up_property='value', percentage_values=False)
+        chart.set_highlight_on_hover(enabled=True)
+    chart.open(live=True)
+    breakpoints = None if palette == 'fixed' else session.palettes.breakpoints('co2', store.years, palette)
+    animation = MapAnimation(chart, store, 'co2', breakpoints=breakpoints, title='Average CO2 Emissions - Year: {year}')
+    animation.run()
+    print(animation.report())
+    chart.close()
+
+
+def show_map_per_capita(session, years=(1990, 2022), palette='fixed', workers=1):
+    charts = _import_charts()
+    store = session.store
+    with stage('chart', 'map per capita'):
+        dashboard = charts.map_per_capita_dashboard(session.data, years, store=store, palette=palette,
+                                                    palettes=session.palettes, workers=workers)
+    _print_panel_timings()
+    dashboard.open(live=True)
+
+
+def show_top_emitters(session, year=2022, n=30, race=False, metric='co2', frame_rate=10):
+    charts = _import_charts()
+    ranking = session.ranking(n)
+
+    if not race:
+        with stage('chart', 'top emitters'):
+            dashboard = charts.top_emitters_dashboard(session.data, year=year, n=n, ranking=ranking)
+        _print_panel_timings()
+        dashboard.open()
+        return
+
+    from co2viz.ranking import BarChartRace
+
+    # One bar chart racing through every year, sending the top N of each year
+    with stage('chart', 'bar chart race'):
+        chart, ranking = charts.bar_chart_race(session.store, metric, n=n, ranking=ranking)
+    chart.open(live=True)
+    title = f'Top {n} CO2 Emitting Countries' + (' per Capita' if metric == 'co2_per_capita' else '') + ' - Year {year}'
+    race = BarChartRace(chart, ranking, metric, frame_rate=frame_rate, title=title)
+    race.run()
+    print(race.report())
+    chart.close()
+
+
+def show_all(session):
+    for view, show in [
+        ('continent', show_continent),
+        ('region', lambda session: show_region(session, animate=False)),
+        ('three-types', show_three_types),
+        ('map-years', show_map_years),
+        ('map-per-capita', show_map_per_capita),
+        ('top-emitters', show_top_emitters),
+    ]:
+        missing = [column for column in VIEW_COLUMNS[view] if column not in session.data]
+        if missing:
+            print(f"Skipping {view}: {session.path} has no {', '.join(missing)} column")
+            continue
+        show(session)
+
+
+def _open_session(parser, args, aggregations, columns=None):
+    try:
+        return Session(args.data, columns=columns, chunksize=args.chunksize, aggregations=aggregations)
+    except ValueError as error:
+        # load_chunked() refuses to sum non-additive columns without --aggregate
+        parser.error(str(error))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m co2viz', description='Visualize global CO2 emissions.')
+    parser.add_argument('--data', default=DEFAULT_PATH, help='path to owid-co2-data.csv')
+    parser.add_argument('--license', default=None, help=f'LightningChart license key (default: ${LICENSE_ENV})')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='stream the CSV this many rows at a time, aggregating rows per (country, year); '
+                             'for files too large for memory')
+    parser.add_argument('--aggregate', metavar='COLUMN=HOW', action='append', default=[],
+                        help="with --chunksize, combine the rows of COLUMN by 'sum' or 'mean'; needed for "
+                             "non-additive columns such as co2_per_capita when rows are combined (repeatable)")
+    parser.add_argument('--timings', action='store_true', help='print import/load/transform/chart timings at exit')
+    parser.add_argument('--trace', metavar='PATH', default=None,
+                        help='record spans and counters (rows scanned, points and bytes sent, cache hits) '
+                             'and write them to PATH at exit (default: $CO2VIZ_TRACE)')
+    parser.add_argument('--trace-format', choices=['chrome', 'json'], default='chrome',
+                        help='chrome://tracing / Perfetto trace events, or plain JSON')
+    parser.add_argument('--backend', choices=['lightningchart', 'recording'], default=None,
+                        help='chart backend; recording draws nothing and prints call/point/byte counts '
+                             '(default: $CO2VIZ_BACKEND or lightningchart)')
+    views = parser.add_subparsers(dest='view', required=True)
+
+    continent = views.add_parser('continent', help='CO2 emissions by continent')
+    continent.add_argument('--animate', action='store_true', help='draw the series point by point')
+
+    region = views.add_parser('region', help='CO2 emissions of major regions and countries')
+    region.add_argument('--no-animate', dest='animate', action='store_false', help='draw all series at once')
+    region.add_argument('--years-per-second', type=float, default=20)
+    region.add_argument('--watch', type=float, metavar='SECONDS', default=None,
+                        help='poll the CSV and push new or changed points to the open chart')
+
+    entities = views.add_parser('entities', help='CO2 emissions of every entity, downsampled to the zoom level')
+    entities.add_argument('--monthly', action='store_true', help='interpolate the yearly values to monthly points')
+    entities.add_argument('--pixels', type=int, default=None, help='points per series for the visible x range (default: 1000)')
+    entities.add_argument('--method', choices=['minmax', 'lttb'], default='minmax', help='downsampling method')
+
+    views.add_parser('three-types', help='fossil fuel, land-use change and total emissions')
+
+    map_years = views.add_parser('map-years', help='one CO2 map per year')
+    map_years.add_argument('--years', type=int, nargs='+', default=[1990, 2000, 2010, 2022])
+    map_years.add_argument('--columns', type=int, default=2)
+    map_years.add_argument('--animate', action='store_true', help='one map animated through every year')
+    map_years.add_argument('--palette', choices=['fixed', 'quantile', 'log'], default='fixed',
+                           help='fixed color steps, or steps computed from the data')
+    map_years.add_argument('--workers', type=int, default=1,
+                           help='threads preparing the panels (default: 1, prepared one after another)')
+    map_years.add_argument('--watch', type=float, metavar='SECONDS', default=None,
+                           help='poll the CSV and re-send the changed regions to the open maps')
+
+    map_per_capita = views.add_parser('map-per-capita', help='CO2 and CO2 per capita maps')
+    map_per_capita.add_argument('--years', type=int, nargs='+', default=[1990, 2022])
+    map_per_capita.add_argument('--workers', type=int, default=1,
+                                help='threads preparing the panels (default: 1, prepared one after another)')
+    map_per_capita.add_argument('--palette', choices=['fixed', 'quantile', 'log'], default='fixed',
+                                help='fixed color steps, or steps computed from the data')
+
+    top_emitters = views.add_parser('top-emitters', help='top emitting countries, total and per capita')
+    top_emitters.add_argument('--year', type=int, default=2022)
+    top_emitters.add_argument('--top', type=int, default=30)
+    top_emitters.add_argument('--race', action='store_true', help='one bar chart racing through every year')
+    top_emitters.add_argument('--metric', choices=['co2', 'co2_per_capita'], default='co2', help='ranked metric of the race')
+    top_emitters.add_argument('--frame-rate', type=float, default=10, help='race frames (years) per second')
+
+    views.add_parser('all', help='open every view, sharing one loaded dataset')
+
+    serve = views.add_parser('serve', help='answer continent, top-N, map and breakdown queries over HTTP')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8000)
+    serve.add_argument('--cache-size', type=int, default=1024, help='responses kept in the LRU cache')
+    serve.add_argument('--top', type=int, default=30, help='largest n served by /top')
+    views.add_parser('export', help='render charts headless (see python -m co2viz export -h)', add_help=False)
+
+    args, rest = parser.parse_known_args(argv)
+    if args.timings:
+        from co2viz import timing
+
+        timing.enable()
+    if args.trace:
+        from co2viz import timing
+
+        timing.enable_trace(args.trace, args.trace_format)
+    if args.backend:
+        from co2viz.backend import BACKEND_ENV
+
+        os.environ[BACKEND_ENV] = args.backend
+    if args.view == 'export':
+        from co2viz import export
+
+        # Options given after 'export' come last so they take precedence
+        export.main(['--data', args.data] + (['--license', args.license] if args.license else []) + rest)
+        return
+    if rest:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+    aggregations = {}
+    for item in args.aggregate:
+        column, _, how = item.partition('=')
+        if how not in ('sum', 'mean'):
+            parser.error(f"--aggregate expects COLUMN=sum or COLUMN=mean, got {item!r}")
+        aggregations[column] = how
+
+    # Checked before the dataset is loaded; co2viz.lod (and numpy) is only imported when --pixels is given
+    if args.view == 'entities' and args.pixels is not None:
+        with stage('import', 'co2viz.lod'):
+            from co2viz.lod import MIN_PIXELS
+        if args.pixels < MIN_PIXELS:
+            parser.error(f'--pixels must be at least {MIN_PIXELS}, got {args.pixels}')
+
+    if args.view == 'serve':
+        from co2viz.service import serve
+
+        # No chart is drawn, so the chart backend and its license are not needed
+        serve(_open_session(parser, args, aggregations), args.host, args.port, cache_size=args.cache_size, n=args.top)
+        return
+
+    set_license(args.license)
+    session = _open_session(parser, args, aggregations, VIEW_COLUMNS.get(args.view))
+    missing = [column for column in VIEW_COLUMNS.get(args.view, []) if column not in session.data]
+    if missing:
+        parser.error(f"{args.data} has no {', '.join(missing)} column, needed by the {args.view} view")
+    if args.view == 'continent':
+        show_continent(session, animate=args.animate)
+    elif args.view == 'region':
+        show_region(session, animate=args.animate, years_per_second=args.years_per_second, watch=args.watch)
+    elif args.view == 'entities':
+        show_entities(session, monthly=args.monthly, pixels=args.pixels, method=args.method)
+    elif args.view == 'three-types':
+        show_three_types(session)
+    elif args.view == 'map-years':
+        show_map_years(session, args.years, columns=args.columns, animate=args.animate, watch=args.watch,
+                       palette=args.palette, workers=args.workers)
+    elif args.view == 'map-per-capita':
+        show_map_per_capita(session, args.years, palette=args.palette, workers=args.workers)
+    elif args.view == 'top-emitters':
+        show_top_emitters(session, year=args.year, n=args.top, race=args.race, metric=args.metric,
+                          frame_rate=args.frame_rate)
+    else:
+        show_all(session)
+
+    from co2viz.backend import get_backend
+
+    backend = get_backend()
+    if backend.name == 'recording':
+        for kind, counts in backend.summary().items():
+            print(f"{kind}: {counts}")
@@ -0,0 +1,151 @@
+import glob
+import os
+import shutil
+import time
+import uuid
+
+from co2viz.timing import count, is_tracing, span
+
+# Selects the backend used when none is passed explicitly: 'lightningchart' (default) or 'recording'
+BACKEND_ENV = 'CO2VIZ_BACKEND'
+# Directory where the browser rendering the charts saves its downloads (default: ~/Downloads)
+DOWNLOADS_ENV = 'CO2VIZ_DOWNLOADS'
+
+
+class LightningChartBackend:
+    """Chart backend drawing with LightningChart Python.
+
+    Backends create the top-level objects (ChartXY, Dashboard, MapChart, BarChart)
+    and colors; the chart builders then use the returned objects'
+    own methods (add_line_series, set_data, invalidate_region_values,
+    set_palette_colors, ...), which every backend provides.
+    """
+
+    name = 'lightningchart'
+
+    def __init__(self):
+        import lightningchart
+
+        self.lc = lightningchart
+
+    def _theme(self, theme):
+        return getattr(self.lc.Themes, theme.capitalize())
+
+    def set_license(self, license_key):
+        self.lc.set_license(license_key)
+
+    def color(self, value):
+        """Convert '#rrggbb' or an (r, g, b) tuple to a lightningchart Color."""
+        return self.lc.Color(*value) if isinstance(value, tuple) else self.lc.Color(value)
+
+    def chart_xy(self, title, theme='white'):
+        return self.lc.ChartXY(theme=self._theme(theme), title=title)
+
+    def dashboard(self, rows, columns, theme='white'):
+        return self.lc.Dashboard(rows=rows, columns=columns, theme=self._theme(theme))
+
+    def map_chart(self, theme='white'):
+        return self.lc.MapChart(theme=self._theme(theme))
+
+    def bar_chart(self, vertical=True, theme='white'):
+        return self.lc.BarChart(vertical=vertical, theme=self._theme(theme))
+
+    def save_image(self, chart, file_name, image_format='image/png', downloads=None, timeout=30):
+        """Render ``chart`` and save its screenshot as ``file_name``.
+
+        LightningChart takes the screenshot in the browser that renders the
+        chart, which saves it as a download: the chart is opened live, the
+        image is requested under a unique name and then moved out of the
+        browser's download directory (``downloads``, default $CO2VIZ_DOWNLOADS
+        or ~/Downloads). Raises RuntimeError if it does not appear there
+        within ``timeout`` seconds.
+        """
+        downloads = downloads or os.environ.get(DOWNLOADS_ENV) or os.path.join(os.path.expanduser('~'), 'Downloads')
+        stem = f'co2viz-{uuid.uuid4().hex}'
+        chart.open(live=True)
+        chart.save_to_file(stem, image_format=image_format)
+        deadline = time.monotonic() + timeout
+        while True:
+            # Browsers write to a .crdownload/.part file and rename it once complete
+            saved = [path for path in glob.glob(os.path.join(downloads, stem + '.*'))
+                     if not path.endswith(('.crdownload', '.part'))]
+            if saved:
+                break
+            if time.monotonic() > deadline:
+                raise RuntimeError(f'the browser saved no {image_format} screenshot in {downloads} within {timeout} s '
+                                   f'(set ${DOWNLOADS_ENV} to its download directory)')
+            time.sleep(0.1)
+        shutil.move(saved[0], file_name)
+
+
+# Calls whose result is a chart object of its own (a series, an axis, a dashboard panel...) to trace as well
+_CREATING_CALLS = ('add_', 'get_default_', 'chart_xy', 'dashboard', 'map_chart', 'bar_chart')
+
+
+def _unwrap(value):
+    return value._target if isinstance(value, _Traced) else value
+
+
+class _Traced:
+    """Proxy that records every method call of a backend or chart object as a trace span.
+
+    Each span counts the data points (the longest list argument) and the
+    encoded bytes of the list and dict arguments; the totals go to the
+    'points_sent' and 'bytes_sent' trace counters.
+    """
+
+    def __init__(self, target, kind):
+        self._target = target
+        self._kind = kind
+
+    def __getattr__(self, name):
+        attribute = getattr(self._target, name)
+        if name.startswith('_') or not callable(attribute):
+            return attribute
+
+        def method(*args, **kwargs):
+            args = [_unwrap(value) for value in args]
+            kwargs = {key: _unwrap(value) for key, value in kwargs.items()}
+            with span(f'{self._kind}.{name}', 'chart') as details:
+                result = attribute(*args, **kwargs)
+                data = [value for value in [*args, *kwargs.values()] if isinstance(value, (list, dict))]
+                if data:
+                    from co2viz.payload import encoded_size
+
+                    details['points'] = max(len(value) for value in data)
+                    details['bytes'] = encoded_size(data)
+                    count('points_sent', details['points'])
+                    count('bytes_sent', details['bytes'])
+            if result is self._target:
+                return self
+            if result is not None and (name.startswith(_CREATING_CALLS) or name[:1].isupper()):
+                return _Traced(result, type(result).__name__)
+            return result
+        return method
+
+
+_backends = {}
+_traced_backends = {}
+
+
+def get_backend(name=None):
+    """Return the shared backend called ``name`` (default: $CO2VIZ_BACKEND or lightningchart).
+
+    While tracing (co2viz.timing.enable_trace), the backend and every chart
+    object it creates record their calls as spans.
+    """
+    name = name or os.environ.get(BACKEND_ENV) or 'lightningchart'
+    if name not in _backends:
+        if name == 'lightningchart':
+            _backends[name] = LightningChartBackend()
+        elif name == 'recording':
+            from co2viz.recording import RecordingBackend
+
+            _backends[name] = RecordingBackend()
+        else:
+            raise ValueError(f"Unknown chart backend {name!r}, expected 'lightningchart' or 'recording'")
+    if is_tracing():
+        if name not in _traced_backends:
+            _traced_backends[name] = _Traced(_backends[name], 'backend')
+        return _traced_backends[name]
+    return _backends[name]
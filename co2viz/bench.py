@@ -0,0 +1,207 @@
+"""Benchmark every stage of the chart pipelines on synthetic OWID data.
+
+    python -m co2viz.bench                        # 1x, 10x and 100x the real row count
+    python -m co2viz.bench --scales 1 10 --repeat 5
+    python -m co2viz.bench --compare .co2bench/results-abc1234.json
+
+Charts are built against the recording backend, so no window or license
+is needed. Results are written as JSON; --compare prints the ratio of every
+stage against an earlier run.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+
+DEFAULT_WORKDIR = '.co2bench'
+DEFAULT_SCALES = [1, 10, 100]
+MAP_YEARS = [1990, 2000, 2010, 2022]
+# 16-panel decade grid for the dashboard construction stages
+DECADE_YEARS = list(range(1870, 2021, 10))
+
+
+def _time(function, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return result, {'min': min(timings), 'median': statistics.median(timings), 'repeat': repeat}
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def dataset_path(workdir, scale):
+    from co2viz.synthetic import write_csv
+
+    path = os.path.join(workdir, f'owid-co2-synthetic-x{scale:g}.csv')
+    if not os.path.exists(path):
+        print(f"Generating {path} ...")
+        write_csv(path, scale)
+    return path
+
+
+def bench_scale(path, repeat):
+    import pandas as pd
+
+    from co2viz.charts import CHARTS, REGION_ENTITIES, map_years_dashboard, top_emitters_dashboard
+    from co2viz.data import clear_cache, load_chunked, load_dataset
+    from co2viz.iso import IsoResolver, get_resolver
+    from co2viz.palette import PaletteBuilder
+    from co2viz.payload import encoded_size, measure_allocations
+    from co2viz.pivot import PivotStore
+    from co2viz.ranking import RankingIndex
+    from co2viz.recording import RecordingBackend
+    from co2viz.regions import RegionAggregator
+    from co2viz.series import add_series_data, entity_series
+
+    stages = {}
+    # Payload sizes are only measured for the whole pipelines, not inside the timed stages
+    backend = RecordingBackend(measure_bytes=False)
+
+    def run(name, function, times=repeat):
+        result, stages[name] = _time(function, times)
+        return result
+
+    # CSV load: full parse as in the original scripts, then the column cache
+    run('csv.read_full', lambda: pd.read_csv(path), 1)
+    clear_cache(path)
+    run('csv.cache_cold', lambda: load_dataset(path, report=False), 1)
+    data = run('csv.cache_warm', lambda: load_dataset(path, report=False))
+    run('csv.chunked', lambda: load_chunked(path, report=False), 1)
+    stages['rows'] = len(data)
+
+    # Filtering
+    run('filter.year', lambda: [data[data['year'] == year] for year in MAP_YEARS])
+    run('filter.entities', lambda: data[data['country'].isin(REGION_ENTITIES)])
+
+    # ISO resolution, from an empty table and from a filled one
+    with tempfile.TemporaryDirectory() as table_dir:
+        table_path = os.path.join(table_dir, 'iso_a3.json')
+        cold = run('iso.build_cold', lambda: IsoResolver(table_path).build(data['country'].cat.categories), 1)
+        run('iso.resolve_column', lambda: cold.resolve(data['country']))
+    # The charts below use the table kept with the dataset, as the app and the exporter do
+    resolver = get_resolver(data_path=path).build(data['country'].cat.categories)
+
+    # Aggregation
+    run('aggregate.regions', lambda: RegionAggregator(data).compute('co2'))
+    store = run('aggregate.pivot', lambda: PivotStore(data, metrics=['co2', 'co2_per_capita'], resolver=resolver))
+    ranking = run('aggregate.ranking', lambda: RankingIndex(store, n=30))
+    run('aggregate.top_n_lookup', lambda: [ranking.top(year, 'co2') for year in MAP_YEARS])
+    run('aggregate.palette_quantile', lambda: PaletteBuilder(store).palette('co2', MAP_YEARS, 'quantile'))
+
+    # Payload construction for each kind of chart call
+    def line_payload():
+        series = entity_series(data, REGION_ENTITIES, 'co2', scale=1e6)
+        chart = backend.chart_xy('benchmark')
+        add_series_data({entity: chart.add_line_series() for entity in series}, series)
+    run('payload.add', line_payload)
+    run('payload.set_data', lambda: top_emitters_dashboard(data, resolver=resolver, backend=backend))
+
+    def map_payload():
+        chart = backend.map_chart()
+        for year in MAP_YEARS:
+            chart.invalidate_region_values(store.records(year, 'co2'))
+    run('payload.invalidate_region_values', map_payload)
+
+    # Allocations kept alive by one map frame: dicts built from numpy arrays vs the shared record encoder
+    def dict_records(year):
+        codes, values = store.series(year, 'co2')
+        return [{'ISO_A3': code, 'value': value} for code, value in zip(codes.tolist(), values.tolist())]
+    allocations = {}
+    store.records(MAP_YEARS[0], 'co2')  # the encoder's shared keys are built once, outside the measurement
+    for name, function in [('map_frame_dicts', dict_records), ('map_frame_encoder', lambda year: store.records(year, 'co2'))]:
+        payload, blocks, size = measure_allocations(function, MAP_YEARS[-1])
+        allocations[name] = {'records': len(payload), 'blocks': blocks, 'bytes': size, 'wire_bytes': encoded_size(payload)}
+        # Free it before the next measurement, which would otherwise reuse its memory
+        del payload
+    stages['allocations'] = allocations
+
+    # Dashboard construction, panels prepared one after another and in a thread pool
+    decades = [year for year in DECADE_YEARS if year in store.years]
+    for name, workers in [('sequential', 1), ('parallel', 4)]:
+        run(f'dashboard.decades_{name}',
+            lambda: map_years_dashboard(data, decades, columns=4, store=store, backend=backend, workers=workers))
+
+    # Whole pipelines, with the calls, points and bytes they send
+    pipelines = {}
+    backend = RecordingBackend()
+    for name, build in CHARTS.items():
+        backend.reset()
+        _, timing = _time(lambda: build(data, backend=backend, resolver=resolver), 1)
+        pipelines[name] = dict(timing, **backend.summary())
+    stages['pipelines'] = pipelines
+    return stages
+
+
+def compare(current, baseline):
+    lines = [f"{'scale':>6} {'stage':<36}{'baseline ms':>14}{'current ms':>14}{'ratio':>8}"]
+    for scale, stages in current['results'].items():
+        old_stages = baseline['results'].get(scale, {})
+        for stage, timing in stages.items():
+            old = old_stages.get(stage)
+            if not isinstance(timing, dict) or 'min' not in timing or not old:
+                continue
+            ratio = timing['min'] / old['min'] if old['min'] else float('nan')
+            lines.append(f"{scale:>6} {stage:<36}{old['min'] * 1000:>14.2f}{timing['min'] * 1000:>14.2f}{ratio:>8.2f}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    import numpy
+    import pandas
+
+    parser = argparse.ArgumentParser(prog='python -m co2viz.bench', description='Benchmark the CO2 chart pipelines.')
+    parser.add_argument('--scales', type=float, nargs='+', default=DEFAULT_SCALES, help='multiples of the real row count')
+    parser.add_argument('--repeat', type=int, default=3, help='repetitions of the fast stages')
+    parser.add_argument('--workdir', default=DEFAULT_WORKDIR, help='where synthetic datasets and results are kept')
+    parser.add_argument('--out', default=None, help='results file (default: <workdir>/results-<commit>.json)')
+    parser.add_argument('--compare', default=None, help='earlier results file to compare against')
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.workdir, exist_ok=True)
+    commit = _commit()
+    results = {
+        'meta': {
+            'commit': commit,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': numpy.__version__,
+            'pandas': pandas.__version__,
+        },
+        'results': {},
+    }
+    for scale in args.scales:
+        path = dataset_path(args.workdir, scale)
+        print(f"Benchmarking {path}")
+        stages = bench_scale(path, args.repeat)
+        results['results'][f'{scale:g}'] = stages
+        for stage, timing in stages.items():
+            if isinstance(timing, dict) and 'min' in timing:
+                print(f"  {stage:<36}{timing['min'] * 1000:>12.2f} ms")
+        for name, allocation in stages['allocations'].items():
+            print(f"  {name:<36}{allocation['blocks']:>8} blocks {allocation['bytes']:>8} bytes "
+                  f"{allocation['wire_bytes']:>8} wire bytes")
+
+    out = args.out or os.path.join(args.workdir, f'results-{commit}.json')
+    with open(out, 'w') as f:
+        json.dump(results, f, indent=1)
+    print(f"Results written to {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            print(compare(results, json.load(f)))
+
+
+if __name__ == '__main__':
+    main()
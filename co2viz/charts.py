@@ -0,0 +1,382 @@
+import colorsys
+
+from co2viz.backend import get_backend
+from co2viz.dashboard import Panel, build_dashboard
+from co2viz.lod import DEFAULT_PIXELS, LodLineSeries, LodView
+from co2viz.palette import PaletteBuilder
+from co2viz.pivot import PivotStore
+from co2viz.ranking import RankingIndex
+from co2viz.regions import RegionAggregator
+from co2viz.series import add_series_data, entity_series, interpolate_series
+from co2viz.timing import stage
+
+# Continents, including the derived Americas region
+CONTINENT_ENTITIES = ['Oceania', 'Americas', 'Africa', 'Europe', 'Asia', 'World']
+CONTINENT_COLORS = [
+    (0, 0, 255),     # Blue for Oceania
+    (255, 165, 0),   # Orange for Americas
+    (255, 255, 0),   # Yellow for Africa
+    (0, 255, 0),     # Green for Europe
+    (255, 0, 0),     # Red for Asia
+    (0, 0, 0)        # Black for World
+]
+
+# Major regions and countries
+REGION_ENTITIES = ['World', 'China', 'Europe', 'Oceania', 'United Kingdom', 'United States', 'India', 'Asia', 'Germany', 'France', 'Africa']
+REGION_COLORS = [
+    (0, 0, 0),       # Black for World
+    (255, 0, 0),     # Red
+    (0, 255, 0),     # Green
+    (0, 0, 255),     # Blue
+    (255, 165, 0),   # Orange
+    (128, 0, 128),   # Purple
+    (0, 255, 255),   # Cyan
+    (75, 0, 130),    # Indigo
+    (238, 130, 238), # Violet
+    (139, 69, 19),   # Brown
+    (128, 128, 128)  # Grey
+]
+
+# Color palette for total emissions
+CO2_PALETTE = [
+    {'value': 0.0001, 'color': '#e0f7fa'},  # Light cyan
+    {'value': 1, 'color': '#80deea'},  # Cyan
+    {'value': 10, 'color': '#4dd0e1'},  # Light blue
+    {'value': 20, 'color': '#26c6da'},  # Darker blue
+    {'value': 30, 'color': '#00bcd4'},  # Even darker blue
+    {'value': 40, 'color': '#00acc1'},  # Dark cyan
+    {'value': 50, 'color': '#0097a7'},  # Cyan green
+    {'value': 70, 'color': '#00838f'},  # Green cyan
+    {'value': 100, 'color': '#006064'},  # Dark green cyan
+    {'value': 200, 'color': '#004d40'},  # Dark green
+    {'value': 300, 'color': '#2e7d32'},  # Dark green
+    {'value': 400, 'color': '#388e3c'},  # Green
+    {'value': 500, 'color': '#43a047'},  # Light green
+    {'value': 700, 'color': '#66bb6a'},  # Light green
+    {'value': 900, 'color': '#9ccc65'},  # Green yellow
+    {'value': 1000, 'color': '#d4e157'},  # Yellow
+    {'value': 1500, 'color': '#fbc02d'},  # Yellow orange
+    {'value': 2000, 'color': '#ffa000'},  # Dark orange
+    {'value': 2500, 'color': '#ff8f00'},  # Orange
+    {'value': 3000, 'color': '#ff6f00'},  # Dark orange red
+    {'value': 3500, 'color': '#ff5722'},  # Red
+    {'value': 4000, 'color': '#f4511e'},  # Dark red
+    {'value': 4500, 'color': '#e64a19'},  # Very dark red
+    {'value': 5000, 'color': '#d84315'},  # Deep red
+    {'value': 6000, 'color': '#bf360c'},  # Brown red
+    {'value': 7000, 'color': '#a3320c'},  # Dark brown red
+    {'value': 8000, 'color': '#87281e'},  # Dark maroon
+    {'value': 9000, 'color': '#6d211c'},  # Very dark maroon
+    {'value': 11000, 'color': '#212121'}  # Black
+]
+
+# Color palette for emissions per capita
+PER_CAPITA_PALETTE = [
+    {'value': 0.0001, 'color': '#e0f7fa'},  # Light cyan
+    {'value': 1, 'color': '#b3e5fc'},  # Light blue
+    {'value': 2, 'color': '#81d4fa'},  # Light blue
+    {'value': 3, 'color': '#4fc3f7'},  # Blue
+    {'value': 4, 'color': '#29b6f6'},  # Blue
+    {'value': 5, 'color': '#03a9f4'},  # Blue
+    {'value': 6, 'color': '#039be5'},  # Dark blue
+    {'value': 7, 'color': '#0288d1'},  # Dark blue
+    {'value': 8, 'color': '#0277bd'},  # Dark blue
+    {'value': 9, 'color': '#01579b'},  # Dark blue
+    {'value': 10, 'color': '#80deea'},  # Cyan
+    {'value': 11, 'color': '#4dd0e1'},  # Light blue
+    {'value': 12, 'color': '#26c6da'},  # Darker blue
+    {'value': 13, 'color': '#00bcd4'},  # Even darker blue
+    {'value': 14, 'color': '#00acc1'},  # Dark cyan
+    {'value': 15, 'color': '#0097a7'},  # Cyan green
+    {'value': 16, 'color': '#00838f'},  # Green cyan
+    {'value': 17, 'color': '#006064'},  # Dark green cyan
+    {'value': 18, 'color': '#004d40'},  # Dark green
+    {'value': 19, 'color': '#2e7d32'},  # Dark green
+    {'value': 20, 'color': '#388e3c'},  # Green
+    {'value': 40, 'color': '#43a047'},  # Light green
+    {'value': 60, 'color': '#4caf50'},  # Light green
+    {'value': 80, 'color': '#66bb6a'},  # Light green
+    {'value': 100, 'color': '#81c784'},  # Light green
+    {'value': 150, 'color': '#9ccc65'},  # Green yellow
+    {'value': 200, 'color': '#d4e157'},  # Yellow
+    {'value': 250, 'color': '#dce775'},  # Yellow
+    {'value': 300, 'color': '#fbc02d'},  # Yellow orange
+    {'value': 400, 'color': '#ffeb3b'},  # Yellow
+    {'value': 500, 'color': '#ffc107'},  # Yellow orange
+    {'value': 600, 'color': '#ffa000'},  # Dark orange
+    {'value': 700, 'color': '#ff8f00'},  # Orange
+    {'value': 800, 'color': '#ff6f00'},  # Dark orange red
+    {'value': 900, 'color': '#ff5722'},  # Red
+    {'value': 1000, 'color': '#f4511e'},  # Dark red
+    {'value': 1500, 'color': '#e64a19'},  # Very dark red
+    {'value': 2000, 'color': '#d84315'},  # Deep red
+    {'value': 2500, 'color': '#bf360c'},  # Brown red
+    {'value': 3000, 'color': '#a3320c'},  # Dark brown red
+    {'value': 3500, 'color': '#87281e'},  # Dark maroon
+    {'value': 4000, 'color': '#6d211c'},  # Very dark maroon
+    {'value': 4500, 'color': '#4e342e'},  # Brown
+    {'value': 5000, 'color': '#3e2723'},  # Dark brown
+    {'value': 5500, 'color': '#5d4037'},  # Brown
+    {'value': 6000, 'color': '#4e342e'},  # Dark brown
+    {'value': 6500, 'color': '#3e2723'},  # Very dark brown
+    {'value': 7000, 'color': '#6e3b3b'},  # Dark brown-black
+    {'value': 8000, 'color': '#4e2b2b'},  # Very dark brown-black
+    {'value': 9000, 'color': '#2e1f1f'},  # Extremely dark brown-black
+    {'value': 11000, 'color': '#212121'}  # Black
+]
+
+
+def palette_steps(palette, backend=None):
+    """Palette steps with the colors converted for the backend."""
+    backend = backend or get_backend()
+    return [{'value': step['value'], 'color': backend.color(step['color'])} for step in palette]
+
+
+def map_palette_steps(store, metric, years, palette='fixed', fixed=CO2_PALETTE, palettes=None, backend=None):
+    """Palette steps shared by all map panels of ``metric`` over ``years``.
+
+    ``palette`` is 'fixed' for the hand-made ``fixed`` palette, or 'quantile'
+    / 'log' for steps computed from the data by ``palettes`` (a
+    PaletteBuilder over ``store``). Years without any data fall back to
+    the fixed palette.
+    """
+    if palette != 'fixed':
+        palettes = palettes or PaletteBuilder(store)
+        steps = palettes.palette(metric, years, palette)
+        if steps:
+            return palette_steps(steps, backend)
+    return palette_steps(fixed, backend)
+
+
+def create_line_chart(title, entities, colors, backend=None):
+    """Create a ChartXY with one named, colored line series per entity."""
+    backend = backend or get_backend()
+    chart = backend.chart_xy(title)
+    line_series_dict = {}
+    for i, entity in enumerate(entities):
+        line_series = chart.add_line_series()
+        line_series.set_name(entity)
+        line_series.set_line_color(backend.color(colors[i]))
+        line_series.set_line_thickness(2)
+        line_series_dict[entity] = line_series
+
+    chart.get_default_x_axis().set_title('Year')
+    chart.get_default_y_axis().set_title('CO2 Emissions (Million Metric Tons)')
+    return chart, line_series_dict
+
+
+def continent_chart(data, regions=None, backend=None):
+    """CO2 emissions by continent; returns (chart, line_series_dict, series) without data added."""
+    regions = regions or RegionAggregator(data, ['Americas = North America + South America'])
+    chart, line_series_dict = create_line_chart('CO2 emissions over the years by continent', CONTINENT_ENTITIES, CONTINENT_COLORS, backend)
+    chart.add_legend(
+        horizontal=False,
+        title='Regions',
+        x=12 , y=42,
+        data=chart
+    )
+    # Build year/value arrays for every entity in one pass (million metric tons)
+    with stage('transform', 'continent series'):
+        series = entity_series(data, CONTINENT_ENTITIES, 'co2', scale=1e6)
+        series.update(entity_series(regions.compute('co2', names=['Americas']), ['Americas'], 'co2', scale=1e6))
+    return chart, line_series_dict, series
+
+
+def region_chart(data, backend=None):
+    """CO2 emissions of major regions and countries; returns (chart, line_series_dict, series) without data added."""
+    chart, line_series_dict = create_line_chart('CO2 Emissions Over the Years', REGION_ENTITIES, REGION_COLORS, backend)
+    chart.add_legend(x=15, y=35, data=chart)
+    with stage('transform', 'region series'):
+        series = entity_series(data, REGION_ENTITIES, 'co2', scale=1e6)
+    return chart, line_series_dict, series
+
+
+def entity_colors(count):
+    """``count`` distinct (r, g, b) colors, evenly spaced around the hue circle."""
+    return [tuple(round(c * 255) for c in colorsys.hsv_to_rgb(i / count, 0.8, 0.85)) for i in range(count)]
+
+
+def entities_chart(data, entities=None, monthly=False, pixels=DEFAULT_PIXELS, method='minmax', backend=None):
+    """CO2 emissions of every entity (or ``entities``), with level-of-detail downsampling.
+
+    Returns (chart, lod_view); call lod_view.show_all() to send the overview,
+    and lod_view.attach() once the chart is open live to follow x-axis zooms.
+    """
+    if entities is None:
+        entities = data['country'].dropna().unique().tolist()
+    with stage('transform', 'entity series'):
+        series = entity_series(data, entities, 'co2', scale=1e6)
+        if monthly:
+            series = interpolate_series(series, steps_per_year=12)
+    entities = [entity for entity in entities if entity in series]
+    chart, line_series_dict = create_line_chart('CO2 Emissions of All Entities', entities, entity_colors(len(entities)), backend)
+    with stage('transform', 'LOD pyramids'):
+        lod_series = {
+            entity: LodLineSeries(line_series_dict[entity], *series[entity], pixels=pixels, method=method)
+            for entity in entities
+        }
+    return chart, LodView(chart.get_default_x_axis(), lod_series)
+
+
+def three_types_chart(data, backend=None):
+    """Global fossil fuel, land-use change and total CO2 emissions."""
+    backend = backend or get_backend()
+    columns = ['year', 'co2', 'co2_including_luc', 'land_use_change_co2']
+    world_data = data.loc[data['country'] == 'World', columns].dropna(subset=columns)
+    years = world_data['year'].tolist()
+
+    chart = backend.chart_xy('Global CO2 Emissions Over the Years (Fossil Fuels Land-Use Change and Total Emissions)')
+    # Emissions in billion metric tons
+    for column, name, color in [
+        ('co2_including_luc', 'Total (fossil fuels and land-use change)', (255, 0, 128)),  # Pink color
+        ('co2', 'Fossil fuels', (255, 165, 0)),  # Orange color
+        ('land_use_change_co2', 'Land-use change', (0, 128, 0)),  # Green color
+    ]:
+        line_series = chart.add_line_series()
+        line_series.add(years, (world_data[column] / 1e9).tolist())
+        line_series.set_name(name)
+        line_series.set_line_color(backend.color(color))
+        line_series.set_line_thickness(2)
+
+    x_axis = chart.get_default_x_axis()
+    x_axis.set_title('Year')
+    x_axis.set_interval(min(years), max(years))
+    chart.get_default_y_axis().set_title('CO2 Emissions (Billion Metric Tons)')
+    chart.add_legend(x=25, y=40, data=chart)
+    return chart
+
+
+def fill_map_chart(chart, records, steps):
+    """Send region values and the palette to a MapChart."""
+    chart.invalidate_region_values(records)
+    chart.set_palette_colors(
+        steps=steps,
+        look_up_property='value',
+        percentage_values=False
+    )
+    chart.set_highlight_on_hover(enabled=True)
+    return chart
+
+
+def map_panel(store, year, metric, row, column, title, steps):
+    """Dashboard panel showing one (year, metric) slice of the pivot store."""
+    return Panel('MapChart', row, column, title,
+                 prepare=lambda: store.records(year, metric),
+                 commit=lambda chart, records: fill_map_chart(chart, records, steps))
+
+
+def map_years_panels(data, years=(1990, 2000, 2010, 2022), columns=2, store=None, backend=None,
+                     palette='fixed', palettes=None, workers=1, resolver=None):
+    """One CO2 map panel per year; returns (dashboard, [(chart, year, metric), ...])."""
+    backend = backend or get_backend()
+    store = store or PivotStore(data, metrics=['co2'], resolver=resolver)
+    dashboard = backend.dashboard(rows=-(-len(years) // columns), columns=columns)
+    steps = map_palette_steps(store, 'co2', years, palette, CO2_PALETTE, palettes, backend)
+    panels = [
+        map_panel(store, year, 'co2', i // columns, i % columns, f"Average CO2 Emissions - Year: {year}", steps)
+        for i, year in enumerate(years)
+    ]
+    charts = build_dashboard(dashboard, panels, workers)
+    return dashboard, [(chart, year, 'co2') for chart, year in zip(charts, years)]
+
+
+def map_years_dashboard(data, years=(1990, 2000, 2010, 2022), columns=2, store=None, backend=None,
+                        palette='fixed', palettes=None, workers=1, resolver=None):
+    """One CO2 map panel per year."""
+    return map_years_panels(data, years, columns, store, backend, palette, palettes, workers, resolver)[0]
+
+
+def map_per_capita_dashboard(data, years=(1990, 2022), store=None, backend=None, palette='fixed', palettes=None,
+                             workers=1, resolver=None):
+    """CO2 and CO2 per capita maps, one column per year."""
+    backend = backend or get_backend()
+    store = store or PivotStore(data, metrics=['co2', 'co2_per_capita'], resolver=resolver)
+    palettes = palettes or PaletteBuilder(store)
+    dashboard = backend.dashboard(rows=2, columns=len(years))
+    panels = []
+    for row_index, (metric, title_suffix) in enumerate([('co2', 't'), ('co2_per_capita', 't per capita')]):
+        # One palette per row, shared by the panels of every year
+        steps = map_palette_steps(store, metric, years, palette, PER_CAPITA_PALETTE, palettes, backend)
+        for column_index, year in enumerate(years):
+            title = f"Average CO2 Emissions ({title_suffix}) - Year: {year}"
+            panels.append(map_panel(store, year, metric, row_index, column_index, title, steps))
+    build_dashboard(dashboard, panels, workers)
+    return dashboard
+
+
+def _fill_bar_chart(chart, bars):
+    chart.set_sorting('disabled')
+    chart.set_data(bars)
+
+
+def top_emitters_dashboard(data, year=2022, n=30, resolver=None, backend=None, ranking=None, workers=1):
+    """Top-N emitting countries, in total and per capita."""
+    backend = backend or get_backend()
+    if ranking is None:
+        # Only the requested year is needed; aggregates (no ISO_A3 code) are left out of the store
+        store = PivotStore(data[data['year'] == year], metrics=['co2', 'co2_per_capita'], resolver=resolver)
+        ranking = RankingIndex(store, n=n)
+
+    dashboard = backend.dashboard(rows=2, columns=1)
+    panels = [
+        Panel('BarChart', row_index, 0, title,
+              prepare=lambda metric=metric: ranking.bar_data(year, metric, n),
+              commit=_fill_bar_chart, row_span=1, column_span=1)
+        for row_index, (metric, title) in enumerate([
+            ('co2', f'Top {n} CO2 Emitting Countries - Year {year}'),
+            ('co2_per_capita', f'Top {n} CO2 Emitting Countries per Capita - Year {year}'),
+        ])
+    ]
+    build_dashboard(dashboard, panels, workers)
+    return dashboard
+
+
+def bar_chart_race(store, metric='co2', n=30, ranking=None, backend=None):
+    """A single BarChart for BarChartRace, kept sorted by the chart itself."""
+    backend = backend or get_backend()
+    ranking = ranking or RankingIndex(store, metrics=[metric], n=n)
+    chart = backend.bar_chart(vertical=False)
+    chart.set_sorting('descending')
+    chart.set_animation_category_position(True)
+    chart.set_animation_values(True)
+    return chart, ranking
+
+
+def _static_line_chart(builder):
+    def build(data, backend=None, resolver=None):
+        chart, line_series_dict, series = builder(data, backend=backend)
+        add_series_data(line_series_dict, series)
+        return chart
+    build.__name__ = builder.__name__
+    return build
+
+
+def _lod_overview(builder):
+    def build(data, backend=None, resolver=None):
+        chart, lod_view = builder(data, backend=backend)
+        lod_view.show_all()
+        return chart
+    build.__name__ = builder.__name__
+    return build
+
+
+def _without_countries(builder):
+    def build(data, backend=None, resolver=None):
+        return builder(data, backend=backend)
+    build.__name__ = builder.__name__
+    return build
+
+
+# Fully populated charts by name, as used by the batch exporter and the benchmarks;
+# each is called as build(data, backend=None, resolver=None). Pass the resolver of the
+# dataset (iso.get_resolver(data_path=path)): the map and bar charts need its ISO table,
+# the line charts ignore it
+CHARTS = {
+    'continent': _static_line_chart(continent_chart),
+    'region': _static_line_chart(region_chart),
+    'three_types': _without_countries(three_types_chart),
+    'map_years': map_years_dashboard,
+    'map_per_capita': map_per_capita_dashboard,
+    'top_emitters': top_emitters_dashboard,
+    'entities': _lod_overview(entities_chart),
+}
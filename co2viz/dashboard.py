@@ -0,0 +1,100 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from co2viz.timing import span
+
+# Per-panel timings of the most recent build_dashboard() call
+last_build = {}
+
+# Thread pools by worker count, kept for the life of the process so that a build does not pay for starting threads
+_pools = {}
+
+
+class Panel:
+    """One cell of a Dashboard.
+
+    ``prepare()`` computes the panel's payload from the shared data and
+    must not touch any chart; ``commit(chart, payload)`` sends it to the
+    chart created for the cell. ``kind`` is the Dashboard method that
+    creates the chart ('MapChart', 'BarChart', ...).
+    """
+
+    def __init__(self, kind, row, column, title, prepare, commit, row_span=None, column_span=None):
+        self.kind = kind
+        self.row = row
+        self.column = column
+        self.title = title
+        self.prepare = prepare
+        self.commit = commit
+        self.row_span = row_span
+        self.column_span = column_span
+
+    def create(self, dashboard):
+        kwargs = {'column_index': self.column, 'row_index': self.row}
+        if self.row_span is not None:
+            kwargs.update(row_span=self.row_span, column_span=self.column_span)
+        return getattr(dashboard, self.kind)(**kwargs)
+
+
+def _prepare(panel):
+    start = time.perf_counter()
+    with span('panel.prepare', 'dashboard', title=panel.title):
+        result = panel.prepare()
+    return result, time.perf_counter() - start
+
+
+def _pool(workers):
+    if workers not in _pools:
+        _pools[workers] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='co2viz-panel')
+    return _pools[workers]
+
+
+def build_dashboard(dashboard, panels, workers=1):
+    """Prepare every panel's payload, then create and fill the charts in one pass.
+
+    By default the payloads are prepared one after another: from the pivot
+    store a panel takes microseconds, less than handing it to a thread.
+    With ``workers`` > 1 (or None, one per CPU) they are prepared
+    concurrently in a thread pool from the shared, read-only data, which
+    pays off only for costly prepare() functions. Either way the charts are
+    created and sent their data afterwards in panel order from the calling
+    thread, as the chart objects are not thread-safe. Returns the charts.
+    """
+    start = time.perf_counter()
+    if workers == 1:
+        prepared = [_prepare(panel) for panel in panels]
+    else:
+        prepared = list(_pool(workers).map(_prepare, panels))
+    prepare_seconds = time.perf_counter() - start
+
+    charts = []
+    timings = []
+    for panel, (payload, prepare_time) in zip(panels, prepared):
+        commit_start = time.perf_counter()
+        with span('panel.commit', 'dashboard', title=panel.title):
+            chart = panel.create(dashboard)
+            panel.commit(chart, payload)
+            chart.set_title(panel.title)
+        charts.append(chart)
+        timings.append({'title': panel.title, 'prepare': prepare_time, 'commit': time.perf_counter() - commit_start})
+
+    last_build.clear()
+    last_build.update({
+        'panels': timings,
+        'prepare_seconds': prepare_seconds,
+        'seconds': time.perf_counter() - start,
+        'workers': workers,
+    })
+    return charts
+
+
+def report(build=None):
+    """Per-panel prepare and commit times of a build (default: the last one)."""
+    build = build or last_build
+    lines = [f"{'panel':<52}{'prepare ms':>12}{'commit ms':>12}"]
+    for timing in build['panels']:
+        lines.append(f"  {timing['title']:<50}{timing['prepare'] * 1000:>12.2f}{timing['commit'] * 1000:>12.2f}")
+    total_prepare = sum(timing['prepare'] for timing in build['panels'])
+    lines.append(f"{len(build['panels'])} panels: prepare {build['prepare_seconds'] * 1000:.1f} ms "
+                 f"({total_prepare * 1000:.1f} ms of panel work), total {build['seconds'] * 1000:.1f} ms")
+    return '\n'.join(lines)
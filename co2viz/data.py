@@ -0,0 +1,334 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from co2viz.timing import count
+
+# Default location of the Our World in Data CO2 dataset
+DEFAULT_PATH = 'owid-co2-data.csv'
+
+# Columns used by the chart scripts; only these are kept in the binary cache
+CACHED_COLUMNS = ['country', 'year', 'co2', 'co2_per_capita', 'co2_including_luc', 'land_use_change_co2']
+
+# Rows parsed at a time by load_chunked()
+DEFAULT_CHUNKSIZE = 500_000
+
+# How load_chunked() combines several rows of one (country, year): 'sum' or 'mean'.
+# Unlisted emission columns are summed. Non-additive columns (see is_additive) have no
+# default: the per capita values of sectors or months add up, those of subnational
+# regions do not, so combining their rows needs an entry here.
+AGGREGATIONS = {}
+AGGREGATION_METHODS = ('sum', 'mean')
+
+# Column name parts of ratios, which cannot be summed over rows in general
+NON_ADDITIVE_SUFFIXES = ('_per_capita', '_per_gdp', '_per_unit_energy')
+NON_ADDITIVE_PREFIXES = ('share_',)
+
+CACHE_DIR_NAME = '.co2cache'
+CACHE_VERSION = 3
+
+# Timings of the most recent load_dataset() call
+last_load = {}
+
+
+def is_additive(column):
+    """Whether values of ``column`` for parts of a whole add up to the value of the whole."""
+    return not (column.endswith(NON_ADDITIVE_SUFFIXES) or column.startswith(NON_ADDITIVE_PREFIXES))
+
+
+def cache_root_for(path):
+    # The cache lives next to the CSV, shared by every source file of that directory
+    return os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR_NAME)
+
+
+def cache_dir_for(path):
+    # One sub-directory of the cache root per source file
+    return os.path.join(cache_root_for(path), os.path.splitext(os.path.basename(path))[0])
+
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_meta(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, 'meta.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(cache_dir, meta):
+    # Replaced in one step, so readers see either the previous cache or the new one
+    fd, temp_path = tempfile.mkstemp(dir=cache_dir, prefix='.meta-', suffix='.json')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(meta, f, indent=1)
+    os.replace(temp_path, os.path.join(cache_dir, 'meta.json'))
+
+
+def _data_dir(cache_dir, meta):
+    return os.path.join(cache_dir, meta['data'])
+
+
+def _remove_stale(cache_dir, keep):
+    # Columns of earlier versions may still be memory-mapped by a running session; on Windows they
+    # cannot be deleted yet and are left for a later write
+    for entry in os.listdir(cache_dir):
+        if entry in (keep, 'meta.json') or entry.startswith('.meta-'):
+            continue
+        entry = os.path.join(cache_dir, entry)
+        if os.path.isdir(entry):
+            shutil.rmtree(entry, ignore_errors=True)
+        else:
+            try:
+                os.remove(entry)
+            except OSError:
+                pass
+
+
+def _cache_is_fresh(path, cache_dir, meta, columns):
+    if meta is None or meta.get('version') != CACHE_VERSION:
+        return False
+    # Columns the CSV does not have are not expected in the cache either
+    if not (set(columns) & set(meta['header'])) <= set(meta['columns']):
+        return False
+    stat = os.stat(path)
+    if stat.st_size != meta['size']:
+        return False
+    if stat.st_mtime_ns == meta['mtime_ns']:
+        return True
+    # The file was touched; only rebuild if its contents really changed
+    if file_digest(path) != meta['sha1']:
+        return False
+    meta['mtime_ns'] = stat.st_mtime_ns
+    _write_meta(cache_dir, meta)
+    return True
+
+
+def read_csv_columns(path=DEFAULT_PATH, columns=CACHED_COLUMNS):
+    """Parse the cached columns plus ``columns`` (those present in the file) from the CSV."""
+    header = pd.read_csv(path, nrows=0).columns
+    columns = [c for c in dict.fromkeys(list(CACHED_COLUMNS) + list(columns)) if c in header]
+    frame = pd.read_csv(path, usecols=columns)
+    count('rows_scanned', len(frame))
+    return frame
+
+
+def build_cache(path=DEFAULT_PATH, columns=CACHED_COLUMNS):
+    """Parse the CSV once and store the selected columns as .npy files."""
+    return write_cache(path, read_csv_columns(path, columns))
+
+
+def write_cache(path, frame):
+    """Store the columns of ``frame``, parsed from the CSV at ``path``, as the cache of that file.
+
+    The columns are written to a new directory inside the cache, which
+    meta.json then points to; the files of the previous version are never
+    overwritten, since a running session may still have them memory-mapped.
+    Returns the directory of the new columns.
+    """
+    cache_dir = cache_dir_for(path)
+    columns = list(frame.columns)
+    os.makedirs(cache_dir, exist_ok=True)
+    data_dir = tempfile.mkdtemp(dir=cache_dir, prefix='columns-')
+
+    # Country names are stored as integer codes plus one list of distinct names
+    codes, names = pd.factorize(frame['country'], sort=True)
+    np.save(os.path.join(data_dir, 'country.npy'), codes.astype(np.int32))
+    with open(os.path.join(data_dir, 'country_names.json'), 'w') as f:
+        json.dump(list(names), f)
+
+    for column in columns:
+        if column == 'country':
+            continue
+        values = pd.to_numeric(frame[column], errors='coerce')
+        # Keep integer columns such as 'year' integral, everything else as float64
+        values = values.to_numpy(dtype=np.int64 if values.dtype.kind in 'iu' else np.float64)
+        np.save(os.path.join(data_dir, column + '.npy'), values)
+
+    stat = os.stat(path)
+    _write_meta(cache_dir, {
+        'version': CACHE_VERSION,
+        'data': os.path.basename(data_dir),
+        'source': os.path.abspath(path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha1': file_digest(path),
+        'columns': columns,
+        'header': list(pd.read_csv(path, nrows=0).columns),
+        'rows': len(frame),
+    })
+    _remove_stale(cache_dir, os.path.basename(data_dir))
+    return data_dir
+
+
+def read_cache(path=DEFAULT_PATH, columns=None):
+    """The cached columns of ``path`` as they were last written, fresh or not (None if there is no cache)."""
+    cache_dir = cache_dir_for(path)
+    meta = _read_meta(cache_dir)
+    if meta is None or meta.get('version') != CACHE_VERSION:
+        return None
+    return _load_from_cache(_data_dir(cache_dir, meta), meta['columns'] if columns is None else columns)
+
+
+def _load_from_cache(data_dir, columns):
+    data = {}
+    for column in columns:
+        if column == 'country':
+            with open(os.path.join(data_dir, 'country_names.json')) as f:
+                names = json.load(f)
+            codes = np.load(os.path.join(data_dir, 'country.npy'), mmap_mode='r')
+            data['country'] = pd.Categorical.from_codes(np.asarray(codes), categories=names)
+        else:
+            data[column] = np.load(os.path.join(data_dir, column + '.npy'), mmap_mode='r')
+    return pd.DataFrame(data, copy=False)
+
+
+def load_dataset(path=DEFAULT_PATH, columns=CACHED_COLUMNS, report=True):
+    """Load the given columns of the OWID dataset through the binary cache.
+
+    The first call (or any call after the CSV changed) parses the CSV and
+    writes the cache; later calls memory-map the cached columns instead.
+    Columns the CSV does not have are left out of the result.
+    """
+    start = time.perf_counter()
+    cache_dir = cache_dir_for(path)
+    meta = _read_meta(cache_dir)
+    if _cache_is_fresh(path, cache_dir, meta, columns):
+        kind = 'warm'
+    else:
+        kind = 'cold'
+        build_cache(path, columns)
+        meta = _read_meta(cache_dir)
+    columns = [c for c in columns if c in meta['columns']]
+    data = _load_from_cache(_data_dir(cache_dir, meta), columns)
+    count('rows_loaded', len(data))
+    elapsed = time.perf_counter() - start
+
+    last_load.clear()
+    last_load.update({'path': path, 'kind': kind, 'seconds': elapsed, 'rows': len(data)})
+    if report:
+        print(f"Loaded {len(data)} rows x {len(columns)} columns from {path} ({kind} cache) in {elapsed * 1000:.1f} ms")
+    return data
+
+
+def _combine(partials):
+    if len(partials) == 1:
+        return partials[0]
+    return pd.concat(partials).groupby(level=['country', 'year'], sort=False).sum(min_count=1)
+
+
+def _check_combined(before, after, unspecified):
+    # Rows were merged, which is only allowed for columns with a known aggregation
+    if unspecified and after < before:
+        raise ValueError(f"several rows per (country, year) would be combined, but {', '.join(unspecified)} "
+                         f"cannot be summed; give an aggregation ('sum' or 'mean') for "
+                         f"{'it' if len(unspecified) == 1 else 'them'}")
+
+
+def load_chunked(path=DEFAULT_PATH, columns=CACHED_COLUMNS, entities=None, chunksize=DEFAULT_CHUNKSIZE,
+                 aggregations=AGGREGATIONS, report=True):
+    """Stream a CSV too large for memory into one row per (country, year).
+
+    The file is parsed ``chunksize`` rows at a time, keeping only
+    ``columns`` and, if given, the rows of ``entities``. Each chunk is
+    reduced per (country, year) right away (a sum, or a mean for the
+    columns mapped to 'mean' in ``aggregations``); the reduced chunks are
+    combined into the aggregate whenever they outgrow it, so memory holds
+    one chunk plus about twice the aggregate. Several input rows per
+    (country, year), e.g. sectors, subnational regions or months, are
+    combined; this raises ValueError if a non-additive column (a per capita
+    value, a share...) is loaded without an entry in ``aggregations``.
+    The result has the layout of load_dataset(): a categorical 'country',
+    an integer 'year' and float64 metrics, sorted by country and year.
+    """
+    start = time.perf_counter()
+    header = pd.read_csv(path, nrows=0).columns
+    columns = [c for c in dict.fromkeys(['country', 'year'] + list(columns)) if c in header]
+    metrics = [c for c in columns if c not in ('country', 'year')]
+    unknown = {how for how in aggregations.values() if how not in AGGREGATION_METHODS}
+    if unknown:
+        raise ValueError(f"Unknown aggregation {', '.join(map(repr, sorted(unknown)))}, "
+                         f"expected one of {AGGREGATION_METHODS}")
+    averaged = [c for c in metrics if aggregations.get(c) == 'mean']
+    unspecified = [c for c in metrics if c not in aggregations and not is_additive(c)]
+    entities = None if entities is None else set(entities)
+
+    # partials[0] holds the combined aggregate so far, the others the chunks reduced since
+    partials = []
+    pending = 0
+    rows = chunks = 0
+    largest_chunk = 0
+    for chunk in pd.read_csv(path, usecols=columns, chunksize=chunksize):
+        chunks += 1
+        rows += len(chunk)
+        count('rows_scanned', len(chunk))
+        largest_chunk = max(largest_chunk, int(chunk.memory_usage(index=False).sum()))
+        if entities is not None:
+            chunk = chunk[chunk['country'].isin(entities)]
+        chunk = chunk[chunk['year'].notna()]
+        # Averaged columns are carried as a sum plus a count of values, divided at the end
+        for column in averaged:
+            chunk[column + '__count'] = chunk[column].notna().astype(np.int64)
+        partials.append(chunk.groupby(['country', 'year'], sort=False).sum(min_count=1))
+        _check_combined(len(chunk), len(partials[-1]), unspecified)
+        pending += len(partials[-1])
+        # Combine once the new partials outgrow the aggregate (and a chunk), so every row is
+        # regrouped O(log chunks) times rather than once per chunk
+        if len(partials) > 1 and pending >= max(chunksize, len(partials[0])):
+            combined = _combine(partials)
+            _check_combined(sum(map(len, partials)), len(combined), unspecified)
+            partials = [combined]
+            pending = 0
+
+    if partials:
+        aggregate = _combine(partials)
+        _check_combined(sum(map(len, partials)), len(aggregate), unspecified)
+    else:
+        aggregate = pd.DataFrame(columns=columns).set_index(['country', 'year'])
+    for column in averaged:
+        aggregate[column] = aggregate[column] / aggregate.pop(column + '__count').replace(0, np.nan)
+    data = aggregate.reset_index().sort_values(['country', 'year'], ignore_index=True)
+    data['country'] = pd.Categorical(data['country'], categories=sorted(data['country'].unique()))
+    data['year'] = data['year'].astype(np.int64)
+    data[metrics] = data[metrics].astype(np.float64)
+    data = data[columns]
+    count('rows_loaded', len(data))
+    elapsed = time.perf_counter() - start
+
+    last_load.clear()
+    last_load.update({
+        'path': path, 'kind': 'chunked', 'seconds': elapsed, 'rows': len(data),
+        'rows_scanned': rows, 'chunks': chunks, 'largest_chunk_bytes': largest_chunk,
+    })
+    if report:
+        print(f"Aggregated {rows} rows in {chunks} chunks of {path} to {len(data)} (country, year) rows "
+              f"in {elapsed * 1000:.1f} ms (largest chunk {largest_chunk / 1e6:.1f} MB)")
+    return data
+
+
+def clear_cache(path=DEFAULT_PATH):
+    shutil.rmtree(cache_dir_for(path), ignore_errors=True)
+
+
+if __name__ == '__main__':
+    import sys
+
+    # Compare a cold load (cache rebuilt) against a warm load (cache hit)
+    source = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH
+    start = time.perf_counter()
+    pd.read_csv(source)
+    print(f"Full pd.read_csv baseline: {(time.perf_counter() - start) * 1000:.1f} ms")
+    clear_cache(source)
+    load_dataset(source)
+    load_dataset(source)
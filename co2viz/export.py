@@ -0,0 +1,110 @@
+"""Build charts and save them as images.
+
+    python -m co2viz.export                      # all charts into images/
+    python -m co2viz.export continent map_years --out reports --workers 2
+
+Charts are built in a process pool. The parent process warms the dataset
+cache first, so every worker only memory-maps the already converted data.
+Images are saved by the chart backend (save_image); LightningChart renders
+each chart in the browser and moves the downloaded screenshot into place.
+The recording backend draws nothing, so it cannot export.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from co2viz.app import LICENSE_ENV, set_license
+from co2viz.backend import DOWNLOADS_ENV, get_backend
+from co2viz.data import DEFAULT_PATH, load_dataset
+from co2viz.iso import get_resolver
+
+IMAGE_FORMATS = {'png': 'image/png', 'jpeg': 'image/jpeg', 'webp': 'image/webp'}
+
+_worker_data = None
+_worker_resolver = None
+
+
+def _init_worker(path, license_key):
+    global _worker_data, _worker_resolver
+    set_license(license_key)
+    _worker_data = load_dataset(path, report=False)
+    _worker_resolver = get_resolver(data_path=path)
+
+
+def _check_backend(backend):
+    if not hasattr(backend, 'save_image'):
+        raise RuntimeError(f'the {backend.name} backend draws nothing and cannot export images; '
+                           f'use the lightningchart backend')
+
+
+def export_chart(name, out_dir, image_format='png', data=None, resolver=None, backend=None, downloads=None):
+    """Build one chart from CHARTS and save it; returns its timings.
+
+    Raises RuntimeError if the backend cannot export or no image was written.
+    """
+    from co2viz.charts import CHARTS
+
+    data = _worker_data if data is None else data
+    resolver = resolver or _worker_resolver
+    backend = backend or get_backend()
+    _check_backend(backend)
+    start = time.perf_counter()
+    chart = CHARTS[name](data, backend=backend, resolver=resolver)
+    built = time.perf_counter()
+    file_name = os.path.abspath(os.path.join(out_dir, f'{name}.{image_format}'))
+    backend.save_image(chart, file_name, IMAGE_FORMATS[image_format], downloads=downloads)
+    if not os.path.isfile(file_name) or os.path.getsize(file_name) == 0:
+        raise RuntimeError(f'exporting {name} wrote no image to {file_name}')
+    done = time.perf_counter()
+    return {'chart': name, 'file': file_name, 'build_seconds': built - start, 'export_seconds': done - built}
+
+
+def export_charts(names, out_dir, path=DEFAULT_PATH, image_format='png', workers=None, license_key=None,
+                  downloads=None):
+    """Export the given charts in parallel and return the timings of each."""
+    # Fail before loading anything when the backend cannot save images
+    _check_backend(get_backend())
+    os.makedirs(out_dir, exist_ok=True)
+    # Convert the CSV and fill the ISO table once here so the workers only read them
+    data = load_dataset(path)
+    get_resolver(data_path=path).build(data['country'].cat.categories)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(path, license_key)) as pool:
+        futures = [pool.submit(export_chart, name, out_dir, image_format, downloads=downloads) for name in names]
+        return [future.result() for future in futures]
+
+
+def main(argv=None):
+    from co2viz.charts import CHARTS
+
+    parser = argparse.ArgumentParser(prog='python -m co2viz.export', description='Render CO2 charts headless and save them as images.')
+    # Validated below: argparse checks the empty list of a nargs='*' positional against its choices
+    parser.add_argument('charts', nargs='*', metavar='chart',
+                        help=f"charts to export, from {', '.join([*CHARTS, 'all'])} (default: all)")
+    parser.add_argument('--data', default=DEFAULT_PATH, help='path to owid-co2-data.csv')
+    parser.add_argument('--out', default='images', help='output directory')
+    parser.add_argument('--format', default='png', choices=IMAGE_FORMATS)
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes')
+    parser.add_argument('--license', default=None, help=f'LightningChart license key (default: ${LICENSE_ENV})')
+    parser.add_argument('--downloads', default=None,
+                        help=f"the browser's download directory, where screenshots are picked up "
+                             f"(default: ${DOWNLOADS_ENV} or ~/Downloads)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.charts if name not in CHARTS and name != 'all']
+    if unknown:
+        parser.error(f"unknown chart {', '.join(unknown)} (choose from {', '.join([*CHARTS, 'all'])})")
+
+    names = list(CHARTS) if not args.charts or 'all' in args.charts else args.charts
+    start = time.perf_counter()
+    try:
+        results = export_charts(names, args.out, args.data, args.format, args.workers, args.license, args.downloads)
+    except RuntimeError as error:
+        parser.exit(1, f'{parser.prog}: error: {error}\n')
+    for result in results:
+        print(f"{result['chart']:<16} build {result['build_seconds'] * 1000:8.1f} ms   "
+              f"export {result['export_seconds'] * 1000:8.1f} ms   -> {result['file']}")
+    print(f"Exported {len(results)} charts in {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
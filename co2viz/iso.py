@@ -0,0 +1,179 @@
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from co2viz.data import DEFAULT_PATH, cache_root_for
+from co2viz.timing import count, stage
+
+# OWID country names that pycountry does not resolve on its own
+MANUAL_MAPPING = {
+    'Bolivia': 'BOL',
+    'Bonaire Sint Eustatius and Saba': 'BES',
+    'Brunei': 'BRN',
+    'Cape Verde': 'CPV',
+    'Congo': 'COG',
+    "Cote d'Ivoire": 'CIV',
+    'Curacao': 'CUW',
+    'Democratic Republic of Congo': 'COD',
+    'East Timor': 'TLS',
+    'Greenland': 'GRL',
+    'Hong Kong': 'HKG',
+    'Iran': 'IRN',
+    'Laos': 'LAO',
+    'Libya': 'LBY',
+    'Macao': 'MAC',
+    'Micronesia (country)': 'FSM',
+    'Moldova': 'MDA',
+    'North Korea': 'PRK',
+    'Palestine': 'PSE',
+    'Russia': 'RUS',
+    'Saint Martin (French part)': 'MAF',
+    'Singapore': 'SGP',
+    'Sint Maarten (Dutch part)': 'SXM',
+    'South Africa': 'ZAF',
+    'South Korea': 'KOR',
+    'Syria': 'SYR',
+    'Taiwan': 'TWN',
+    'Tanzania': 'TZA',
+    'Turkey': 'TUR',
+    'United Arab Emirates': 'ARE',
+    'Vatican': 'VAT',
+    'Venezuela': 'VEN',
+    'Vietnam': 'VNM',
+}
+
+
+def table_path_for(data_path=DEFAULT_PATH):
+    """The ISO table stored in the cache root of the dataset at ``data_path``."""
+    return os.path.join(cache_root_for(data_path), 'iso_a3.json')
+
+
+def _import_pycountry():
+    # pycountry loads its whole ISO database on import, so only do it on the first table miss
+    if 'pycountry' not in sys.modules:
+        with stage('import', 'pycountry'):
+            import pycountry
+    return sys.modules['pycountry']
+
+
+def lookup_iso_a3(country_name):
+    """Resolve a single country name, or return None for aggregates such as 'World'."""
+    if country_name in MANUAL_MAPPING:
+        return MANUAL_MAPPING[country_name]
+    pycountry = _import_pycountry()
+    country = pycountry.countries.get(name=country_name)
+    if country is not None:
+        return country.alpha_3
+    try:
+        return pycountry.countries.lookup(country_name).alpha_3
+    except LookupError:
+        return None
+
+
+class IsoResolver:
+    """Country name -> ISO alpha-3 table shared by the map and bar charts.
+
+    Every distinct name is looked up once and the table is persisted to
+    ``table_path`` (default: next to the cache of the default dataset), so
+    later runs never touch pycountry for known names.
+    Names that cannot be resolved (continents, income groups, '(GCP)'
+    regions...) map to None and are treated as non-countries.
+    """
+
+    def __init__(self, table_path=None):
+        self.table_path = table_path or table_path_for()
+        self.table = {}
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.table_path) as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return
+        # A changed manual mapping invalidates the stored table
+        if stored.get('manual_mapping') == MANUAL_MAPPING:
+            self.table = stored['names']
+
+    def save(self):
+        directory = os.path.dirname(self.table_path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        # Written aside and renamed over the table, so that a process reading it (an export worker,
+        # a concurrent run) sees either the old table or the new one, never a partial file
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.iso_a3-', suffix='.json')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'manual_mapping': MANUAL_MAPPING, 'names': self.table}, f, indent=1, sort_keys=True)
+            os.replace(temp_path, self.table_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def build(self, names):
+        """Resolve every name not yet in the table and persist the result."""
+        distinct = pd.unique(np.asarray(names, dtype=object))
+        missing = [name for name in distinct if name not in self.table]
+        self.hits += len(distinct) - len(missing)
+        self.misses += len(missing)
+        count('iso_lookup_hits', len(distinct) - len(missing))
+        count('iso_lookup_misses', len(missing))
+        for name in missing:
+            self.table[name] = lookup_iso_a3(name)
+        if missing:
+            self.save()
+        return self
+
+    def resolve(self, column):
+        """Map a Series of country names to ISO alpha-3 codes (None if unresolved)."""
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            # Map the distinct categories once, then gather by code; code -1 (NaN) hits the trailing None
+            categories = column.cat.categories
+            self.build(categories)
+            mapped = np.array([self.table[name] for name in categories] + [None], dtype=object)
+            return pd.Series(mapped[column.cat.codes.to_numpy()], index=column.index, name='ISO_A3')
+        self.build(column.dropna())
+        return column.map(self.table).rename('ISO_A3')
+
+    def is_country(self, column):
+        """Boolean mask of the rows whose name resolves to a country."""
+        return self.resolve(column).notna()
+
+    @property
+    def unresolved(self):
+        return sorted(name for name, code in self.table.items() if code is None)
+
+    def report(self):
+        resolved = sum(code is not None for code in self.table.values())
+        return (f"{resolved} of {len(self.table)} names resolved to ISO alpha-3; "
+                f"unresolved (treated as aggregates): {', '.join(self.unresolved)}")
+
+
+_resolvers = {}
+
+
+def get_resolver(table_path=None, data_path=DEFAULT_PATH):
+    """Return the shared resolver for ``table_path``, creating it on first use.
+
+    Without ``table_path``, the table is kept with the cache of the dataset at ``data_path``.
+    """
+    table_path = os.path.abspath(table_path or table_path_for(data_path))
+    if table_path not in _resolvers:
+        _resolvers[table_path] = IsoResolver(table_path)
+    return _resolvers[table_path]
+
+
+if __name__ == '__main__':
+    import sys
+
+    from co2viz.data import load_dataset
+
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH
+    data = load_dataset(path, columns=['country'])
+    resolver = get_resolver(data_path=path).build(data['country'].cat.categories)
+    print(resolver.report())
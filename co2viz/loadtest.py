@@ -0,0 +1,168 @@
+"""Load test of the query service (co2viz.service).
+
+    python -m co2viz serve &
+    python -m co2viz.loadtest --requests 20000 --concurrency 32
+
+Each client keeps one HTTP/1.1 connection open and sends its requests
+back to back; the endpoints and years are drawn at random (fixed seed)
+from the service's /meta. With ``--start``, a local instance is started
+on a free port first and stopped afterwards.
+"""
+import argparse
+import asyncio
+import json
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from co2viz.service import DEFAULT_HOST, DEFAULT_PORT
+
+
+async def _get(reader, writer, host, target):
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode('latin-1'))
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+def request_mix(meta, count, seed=0):
+    """``count`` request targets: per-year maps and rankings for random years, plus continents and breakdown."""
+    rng = random.Random(seed)
+    years = meta['years']
+    targets = []
+    for _ in range(count):
+        kind = rng.random()
+        year = rng.choice(years)
+        metric = rng.choice(meta['metrics'])
+        if kind < 0.4:
+            targets.append(f'/map?year={year}&metric={metric}')
+        elif kind < 0.8:
+            targets.append(f'/top?year={year}&metric={metric}&n={meta["top_n"]}')
+        elif kind < 0.9:
+            targets.append(f"/continents?metric={rng.choice(meta['continent_metrics'])}")
+        else:
+            targets.append('/breakdown')
+    return targets
+
+
+async def _client(host, port, targets, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for target in targets:
+            start = time.perf_counter()
+            status, _ = await _get(reader, writer, host, target)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append((target, status))
+    finally:
+        writer.close()
+
+
+async def run(host=DEFAULT_HOST, port=DEFAULT_PORT, requests=10000, concurrency=16, seed=0):
+    """Send ``requests`` requests over ``concurrency`` connections; returns the latency statistics."""
+    if requests < 2 or concurrency < 1:
+        raise ValueError(f'need at least 2 requests for the latency percentiles and 1 connection, '
+                         f'got {requests} and {concurrency}')
+    reader, writer = await asyncio.open_connection(host, port)
+    status, body = await _get(reader, writer, host, '/meta')
+    writer.close()
+    if status != 200:
+        raise RuntimeError(f'/meta returned {status}: {body.decode()}')
+    targets = request_mix(json.loads(body), requests, seed)
+
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        _client(host, port, targets[i::concurrency], latencies, errors) for i in range(concurrency)
+    ])
+    seconds = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    _, body = await _get(reader, writer, host, '/stats')
+    writer.close()
+
+    percentiles = statistics.quantiles(latencies, n=100, method='inclusive')
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'concurrency': concurrency,
+        'seconds': seconds,
+        'requests_per_second': len(latencies) / seconds,
+        'p50_ms': percentiles[49] * 1000,
+        'p99_ms': percentiles[98] * 1000,
+        'max_ms': max(latencies) * 1000,
+        'cache': json.loads(body)['cache'],
+    }
+
+
+def report(stats):
+    cache = stats['cache']
+    return (f"{stats['requests']} requests ({stats['errors']} errors) over {stats['concurrency']} connections "
+            f"in {stats['seconds']:.2f} s ({stats['requests_per_second']:.0f} requests/s)\n"
+            f"latency: p50 {stats['p50_ms']:.2f} ms, p99 {stats['p99_ms']:.2f} ms, max {stats['max_ms']:.2f} ms\n"
+            f"response cache: {cache['hits']} hits, {cache['misses']} misses, {cache['size']}/{cache['capacity']} entries")
+
+
+def _free_port(host):
+    with socket.socket() as s:
+        s.bind((host, 0))
+        return s.getsockname()[1]
+
+
+def start_service(data, host=DEFAULT_HOST, port=None, timeout=120.0):
+    """Start ``python -m co2viz serve`` on ``data`` and wait until it accepts connections; returns (process, port)."""
+    port = port or _free_port(host)
+    process = subprocess.Popen([sys.executable, '-m', 'co2viz', '--data', data, 'serve', '--host', host, '--port', str(port)])
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection((host, port), timeout=1.0).close()
+            return process, port
+        except OSError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError(f'the query service did not start on {host}:{port}')
+            time.sleep(0.1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m co2viz.loadtest', description='Load test the CO2 query service.')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=None, help=f'port of the service (default: {DEFAULT_PORT}, or a free one with --start)')
+    parser.add_argument('--requests', type=int, default=10000)
+    parser.add_argument('--concurrency', type=int, default=16, help='open connections sending requests')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the random request mix')
+    parser.add_argument('--start', action='store_true', help='start a local instance of the service for the test')
+    parser.add_argument('--data', default='owid-co2-data.csv', help='dataset of the instance started with --start')
+    args = parser.parse_args(argv)
+    if args.requests < 2:
+        parser.error(f'--requests must be at least 2 to compute latency percentiles, got {args.requests}')
+    if args.concurrency < 1:
+        parser.error(f'--concurrency must be at least 1, got {args.concurrency}')
+
+    process = None
+    port = args.port or DEFAULT_PORT
+    if args.start:
+        process, port = start_service(args.data, args.host, args.port)
+    try:
+        stats = asyncio.run(run(args.host, port, args.requests, args.concurrency, args.seed))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    print(report(stats))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+import numpy as np
+
+# Points sent per series for the visible x range, about one per horizontal pixel of the chart
+DEFAULT_PIXELS = 1000
+
+# Fewest points per series a level may be reduced to; below this the methods cannot reduce reliably
+MIN_PIXELS = 4
+
+METHODS = ['minmax', 'lttb']
+
+
+def minmax_indices(x, y, buckets):
+    """Indices of the minimum and maximum point of each of ``buckets`` equal-count buckets.
+
+    Keeps the first and last point and at most two points per bucket, in x
+    order, so spikes survive downsampling.
+    """
+    n = len(x)
+    if n <= 2 * buckets:
+        return np.arange(n)
+    bucket = np.arange(n) * buckets // n
+    # Bucket ids are already sorted, so this sorts y within each bucket
+    order = np.lexsort((y, bucket))
+    starts = np.searchsorted(bucket, np.arange(buckets))
+    ends = np.append(starts[1:], n) - 1
+    return np.unique(np.concatenate(([0, n - 1], order[starts], order[ends])))
+
+
+def lttb_indices(x, y, threshold):
+    """Indices picked by Largest-Triangle-Three-Buckets, ``threshold`` points in total."""
+    n = len(x)
+    if n <= threshold or threshold < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        # Average point of the next bucket (the last point for the final bucket)
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_start = min(end, next_end - 1)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+    return indices
+
+
+def downsample(x, y, points, method='minmax'):
+    """Indices of about ``points`` representative points of (x, y)."""
+    if method == 'minmax':
+        return minmax_indices(x, y, max(1, points // 2))
+    if method == 'lttb':
+        return lttb_indices(x, y, points)
+    raise ValueError(f'Unknown downsampling method {method!r}, expected one of {METHODS}')
+
+
+class Pyramid:
+    """Multi-resolution copies of one (x, y) series.
+
+    Level 0 is the full data; every further level has about half the
+    points of the one before, down to a level of at most ``pixels``
+    points. For any x range, select() returns the most detailed level that
+    still has at most ``pixels`` points inside that range.
+    """
+
+    def __init__(self, x, y, pixels=DEFAULT_PIXELS, method='minmax'):
+        if pixels < MIN_PIXELS:
+            raise ValueError(f'pixels must be at least {MIN_PIXELS}, got {pixels}')
+        self.pixels = pixels
+        self.levels = [(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64))]
+        while len(self.levels[-1][0]) > pixels:
+            level_x, level_y = self.levels[-1]
+            indices = downsample(level_x, level_y, len(level_x) // 2, method)
+            if len(indices) >= len(level_x):
+                # The method cannot reduce this level any further
+                break
+            self.levels.append((level_x[indices], level_y[indices]))
+
+    @property
+    def x_range(self):
+        x = self.levels[0][0]
+        return (x[0], x[-1]) if len(x) else (0.0, 0.0)
+
+    def select(self, x_min, x_max):
+        """(level, x, y) of the most detailed level with at most ``pixels`` points in [x_min, x_max].
+
+        One point on either side of the range is included so the line
+        continues to the edges of the view.
+        """
+        for level, (x, y) in enumerate(self.levels):
+            start = max(np.searchsorted(x, x_min, side='left') - 1, 0)
+            end = min(np.searchsorted(x, x_max, side='right') + 1, len(x))
+            if end - start <= self.pixels or level == len(self.levels) - 1:
+                return level, x[start:end], y[start:end]
+
+
+class LodLineSeries:
+    """A line series that shows a Pyramid at the resolution of the visible x range.
+
+    Data is loaded for the view widened by ``margin`` (a fraction of its
+    width) on both sides, so small pans do not send anything; the series
+    is reloaded only when the view leaves the loaded range or needs
+    another level.
+    """
+
+    def __init__(self, line_series, x, y, pixels=DEFAULT_PIXELS, method='minmax', margin=0.5):
+        self.line_series = line_series
+        self.pyramid = Pyramid(x, y, pixels, method)
+        self.margin = margin
+        self.level = None
+        self.loaded = None
+
+        self.fetches = 0
+        self.points_sent = 0
+
+    def show(self, x_min, x_max):
+        """Make sure [x_min, x_max] is loaded at the right level; return the points sent."""
+        width = x_max - x_min
+        level, _, _ = self.pyramid.select(x_min, x_max)
+        if level == self.level and self.loaded[0] <= x_min and x_max <= self.loaded[1]:
+            return 0
+        low, high = x_min - self.margin * width, x_max + self.margin * width
+        # Load the wider range at the level chosen for the view, which may exceed the pixel budget
+        x, y = self.pyramid.levels[level]
+        start = max(np.searchsorted(x, low, side='left') - 1, 0)
+        end = min(np.searchsorted(x, high, side='right') + 1, len(x))
+        self.line_series.clear()
+        self.line_series.add(x[start:end].tolist(), y[start:end].tolist())
+        self.level = level
+        self.loaded = (low, high)
+        self.fetches += 1
+        self.points_sent += end - start
+        return end - start
+
+    def show_all(self):
+        return self.show(*self.pyramid.x_range)
+
+
+class LodView:
+    """Reload every LodLineSeries of a chart when its x axis is zoomed or panned."""
+
+    def __init__(self, axis, lod_series, throttle_ms=100):
+        self.axis = axis
+        self.lod_series = lod_series
+        self.throttle_ms = throttle_ms
+        self.events = 0
+        self.points_sent = 0
+
+    def show_all(self):
+        self.points_sent += sum(lod.show_all() for lod in self.lod_series.values())
+
+    def attach(self):
+        """Listen to the axis interval; call once the chart is open in live mode."""
+        self.axis.add_event_listener('intervalchange', handler=self.on_interval_change, throttle_ms=self.throttle_ms)
+        return self
+
+    def on_interval_change(self, event):
+        self.events += 1
+        start, end = sorted((event['start'], event['end']))
+        self.points_sent += sum(lod.show(start, end) for lod in self.lod_series.values())
+
+    def stats(self):
+        full = sum(len(lod.pyramid.levels[0][0]) for lod in self.lod_series.values())
+        return {
+            'series': len(self.lod_series),
+            'points': full,
+            'levels': max((len(lod.pyramid.levels) for lod in self.lod_series.values()), default=0),
+            'zoom_events': self.events,
+            'fetches': sum(lod.fetches for lod in self.lod_series.values()),
+            'points_sent': self.points_sent,
+        }
+
+    def report(self):
+        stats = self.stats()
+        return (f"{stats['series']} series, {stats['points']} points in up to {stats['levels']} levels; "
+                f"{stats['points_sent']} points sent in {stats['fetches']} fetches after {stats['zoom_events']} zoom events")
@@ -0,0 +1,99 @@
+import queue
+import threading
+import time
+
+import numpy as np
+
+from co2viz.palette import bucket_indices
+from co2viz.timing import span
+
+
+class MapAnimation:
+    """Animate a MapChart through the years of a PivotStore metric.
+
+    The first frame sends every region; later frames send only the regions
+    whose value changed since the previous frame (or, with
+    ``bucket_only=True``, only those that moved to another palette bucket).
+    The changed regions of each frame are computed ahead of time in a
+    background thread, as index arrays; the region records are encoded
+    from them only when the frame is sent.
+    """
+
+    def __init__(self, chart, store, metric, years=None, breakpoints=None, bucket_only=False,
+                 frame_rate=10, prefetch=16, title=None):
+        if bucket_only and breakpoints is None:
+            raise ValueError('bucket_only needs the palette breakpoints')
+        self.chart = chart
+        self.store = store
+        self.metric = metric
+        self.years = list(store.years if years is None else years)
+        self.breakpoints = None if breakpoints is None else np.asarray(breakpoints, dtype=np.float64)
+        self.bucket_only = bucket_only
+        self.frame_rate = frame_rate
+        self.title = title
+        self._queue = queue.Queue(maxsize=prefetch)
+
+        self.frames_sent = 0
+        self.regions_sent = 0
+        self.bytes_sent = 0
+        self.seconds = 0.0
+
+    def frames(self):
+        """Yield (year, values, indices): the store columns of each year's region updates."""
+        previous = None
+        for year in self.years:
+            values = self.store.values(year, self.metric)
+            present = ~np.isnan(values)
+            if previous is None:
+                changed = present
+            elif self.bucket_only:
+                changed = bucket_indices(self.breakpoints, values) != bucket_indices(self.breakpoints, previous)
+            else:
+                # NaN != NaN, so regions missing in both years have to be excluded explicitly
+                changed = (values != previous) & (present | ~np.isnan(previous))
+            previous = values
+            yield year, values, np.flatnonzero(changed)
+
+    def _produce(self):
+        for frame in self.frames():
+            self._queue.put(frame)
+        self._queue.put(None)
+
+    def run(self):
+        """Play all frames at ``frame_rate`` frames per second (blocking)."""
+        encoder = self.store.encoder()
+        threading.Thread(target=self._produce, daemon=True).start()
+        frame_time = 1.0 / self.frame_rate
+        start = time.perf_counter()
+        while True:
+            frame_start = time.perf_counter()
+            item = self._queue.get()
+            if item is None:
+                break
+            year, values, indices = item
+            with span('map_animation.frame', year=year):
+                payload = encoder.encode(values, indices)
+                if payload:
+                    self.chart.invalidate_region_values(payload)
+                if self.title:
+                    self.chart.set_title(self.title.format(year=year))
+            self.frames_sent += 1
+            self.regions_sent += len(payload)
+            self.bytes_sent += encoder.measure(payload)
+            time.sleep(max(0.0, frame_time - (time.perf_counter() - frame_start)))
+        self.seconds = time.perf_counter() - start
+
+    def stats(self):
+        frames = self.frames_sent or float('nan')
+        return {
+            'frames': self.frames_sent,
+            'seconds': self.seconds,
+            'frames_per_second': self.frames_sent / (self.seconds or float('nan')),
+            'regions_per_frame': self.regions_sent / frames,
+            'bytes_per_frame': self.bytes_sent / frames,
+        }
+
+    def report(self):
+        stats = self.stats()
+        return (f"Played {stats['frames']} frames in {stats['seconds']:.2f} s ({stats['frames_per_second']:.1f} frames/s), "
+                f"{stats['regions_per_frame']:.1f} regions and {stats['bytes_per_frame']:.0f} payload bytes per frame")
@@ -0,0 +1,104 @@
+import numpy as np
+
+from co2viz.timing import count
+
+SCALES = ['fixed', 'quantile', 'log']
+
+# Number of palette steps computed from the data
+DEFAULT_STEPS = 16
+
+# Color ramp the computed steps are interpolated along, from low to high values
+DEFAULT_RAMP = ['#e0f7fa', '#4dd0e1', '#00acc1', '#fbc02d', '#ff8f00', '#e64a19', '#87281e', '#212121']
+
+# Bucket of a missing value, apart from the -1 of values below the first step
+MISSING_BUCKET = -2
+
+
+def _nice(values):
+    # Round to two significant digits so the legend stays readable
+    exponent = np.floor(np.log10(np.abs(values))) - 1
+    # Divide by exact powers of ten on both sides of 1 so that e.g. 1.4 is not 1.4000000000000001
+    small = 10.0 ** np.maximum(-exponent, 0)
+    large = 10.0 ** np.maximum(exponent, 0)
+    return np.round(values * small / large) * large / small
+
+
+def quantile_breakpoints(values, steps=DEFAULT_STEPS):
+    """Breakpoints holding about the same number of positive values between each pair."""
+    values = values[np.isfinite(values) & (values > 0)]
+    if not len(values):
+        return np.empty(0)
+    return np.unique(_nice(np.quantile(values, np.linspace(0.0, 1.0, steps))))
+
+
+def log_breakpoints(values, steps=DEFAULT_STEPS):
+    """Breakpoints evenly spaced in log scale between the smallest and largest positive value."""
+    values = values[np.isfinite(values) & (values > 0)]
+    if not len(values):
+        return np.empty(0)
+    return np.unique(_nice(np.geomspace(values.min(), values.max(), steps)))
+
+
+def bucket_indices(breakpoints, values):
+    """Palette step of every value: the last breakpoint <= value, -1 below the first, MISSING_BUCKET for NaN."""
+    buckets = np.searchsorted(breakpoints, values, side='right') - 1
+    buckets[np.isnan(values)] = MISSING_BUCKET
+    return buckets
+
+
+def ramp_colors(count, ramp=DEFAULT_RAMP):
+    """``count`` '#rrggbb' colors interpolated along the ramp."""
+    anchors = np.array([[int(color[i:i + 2], 16) for i in (1, 3, 5)] for color in ramp], dtype=np.float64)
+    positions = np.linspace(0.0, 1.0, len(ramp))
+    targets = np.linspace(0.0, 1.0, count)
+    rgb = np.column_stack([np.interp(targets, positions, anchors[:, channel]) for channel in range(3)])
+    return [f'#{r:02x}{g:02x}{b:02x}' for r, g, b in np.rint(rgb).astype(int).tolist()]
+
+
+class PaletteBuilder:
+    """Palettes computed from the distribution of a PivotStore metric.
+
+    Breakpoints are computed with one vectorized pass over the year range
+    of the matrix and cached per (metric, year range, scale), so every
+    panel and animation frame over the same range shares one palette.
+    """
+
+    def __init__(self, store, steps=DEFAULT_STEPS, ramp=DEFAULT_RAMP):
+        self.store = store
+        self.steps = steps
+        self.ramp = ramp
+        self.colors = ramp_colors(steps, ramp)
+        self._breakpoints = {}
+        self.hits = 0
+        self.misses = 0
+
+    def breakpoints(self, metric, years, scale='quantile'):
+        """Breakpoints of ``metric`` over every year from min(years) to max(years)."""
+        key = (metric, min(years), max(years), scale)
+        if key in self._breakpoints:
+            self.hits += 1
+            count('palette_cache_hits')
+            return self._breakpoints[key]
+        self.misses += 1
+        count('palette_cache_misses')
+        rows = (self.store.years >= key[1]) & (self.store.years <= key[2])
+        values = self.store.matrices[metric][rows].ravel()
+        if scale == 'quantile':
+            breakpoints = quantile_breakpoints(values, self.steps)
+        elif scale == 'log':
+            breakpoints = log_breakpoints(values, self.steps)
+        else:
+            raise ValueError(f'Unknown palette scale {scale!r}, expected one of {SCALES[1:]}')
+        self._breakpoints[key] = breakpoints
+        return breakpoints
+
+    def palette(self, metric, years, scale='quantile'):
+        """Palette steps [{'value', 'color'}] in the format of the fixed palettes in co2viz.charts."""
+        breakpoints = self.breakpoints(metric, years, scale)
+        # Spread the ramp over the breakpoints actually found (duplicates are dropped)
+        colors = self.colors if len(breakpoints) == self.steps else ramp_colors(len(breakpoints), self.ramp)
+        return [{'value': value, 'color': color} for value, color in zip(breakpoints.tolist(), colors)]
+
+    def buckets(self, values, metric, years, scale='quantile'):
+        """Palette bucket of every value, as bucket_indices()."""
+        return bucket_indices(self.breakpoints(metric, years, scale), values)
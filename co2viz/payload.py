@@ -0,0 +1,101 @@
+import json
+import threading
+import tracemalloc
+
+import numpy as np
+
+from co2viz.timing import count
+
+
+def encoded_size(payload):
+    """Bytes of ``payload`` on the wire: msgpack as used by lightningchart, compact JSON without it."""
+    try:
+        import msgpack
+    except ImportError:
+        return len(json.dumps(payload, separators=(',', ':'), default=str))
+    return len(msgpack.packb(payload, default=str))
+
+
+def measure_allocations(function, *args, **kwargs):
+    """Call ``function`` and return (result, blocks, bytes) still allocated by the call.
+
+    Counts what the result keeps alive (payload dicts, floats, strings),
+    which is what a frame costs until it has been sent.
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        result = function(*args, **kwargs)
+        after = tracemalloc.take_snapshot()
+    finally:
+        if started:
+            tracemalloc.stop()
+    stats = after.compare_to(before, 'filename')
+    blocks = sum(stat.count_diff for stat in stats if stat.count_diff > 0)
+    size = sum(stat.size_diff for stat in stats if stat.size_diff > 0)
+    return result, blocks, size
+
+
+class RecordEncoder:
+    """Chart records built from parallel typed arrays of keys and values.
+
+    The keys (ISO codes, bar categories) are turned into Python strings
+    once and shared by every payload; the values of a frame are gathered
+    into a reused float64 buffer (one per thread, as dashboard panels are
+    encoded concurrently). Only the record dicts themselves, the form the
+    chart calls accept, are created per frame.
+    """
+
+    def __init__(self, keys, key_field, value_field='value', missing=None):
+        self.keys = keys.tolist() if isinstance(keys, np.ndarray) else list(keys)
+        self.key_field = key_field
+        self.value_field = value_field
+        self.missing = missing
+        self._local = threading.local()
+
+        self.payloads = 0
+        self.records = 0
+        self.bytes = 0
+
+    def encode(self, values, indices=None):
+        """Records of keys[indices] with values[indices], all keys when ``indices`` is None.
+
+        ``indices`` may also be a boolean mask; NaN values are sent as
+        ``missing``.
+        """
+        if indices is None:
+            indices = range(len(values))
+            gathered = values
+        else:
+            if indices.dtype == bool:
+                indices = np.flatnonzero(indices)
+            buffer = getattr(self._local, 'buffer', None)
+            if buffer is None:
+                buffer = self._local.buffer = np.empty(len(self.keys))
+            gathered = np.take(values, indices, out=buffer[:len(indices)])
+            indices = indices.tolist()
+        keys, key_field, value_field, missing = self.keys, self.key_field, self.value_field, self.missing
+        payload = [
+            {key_field: keys[i], value_field: value if value == value else missing}
+            for i, value in zip(indices, gathered.tolist())
+        ]
+        self.payloads += 1
+        self.records += len(payload)
+        count('records_encoded', len(payload))
+        return payload
+
+    def measure(self, payload):
+        """Add the encoded size of a payload to the byte count; returns it."""
+        size = encoded_size(payload)
+        self.bytes += size
+        return size
+
+    def stats(self):
+        payloads = self.payloads or float('nan')
+        return {
+            'payloads': self.payloads,
+            'records_per_payload': self.records / payloads,
+            'bytes_per_payload': self.bytes / payloads,
+        }
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+
+from co2viz.iso import get_resolver
+from co2viz.payload import RecordEncoder
+from co2viz.timing import count
+
+
+class PivotStore:
+    """Year x ISO alpha-3 matrices of the country-level metrics.
+
+    Built once from the dataset; afterwards any (year, metric) panel is a
+    row view of a matrix instead of a filtered copy of the whole frame.
+    Aggregates without an ISO code are left out.
+    """
+
+    def __init__(self, data, metrics=('co2',), resolver=None):
+        self.resolver = resolver = resolver or get_resolver()
+        iso = resolver.resolve(data['country'])
+        mask = (iso.notna() & data['year'].notna()).to_numpy()
+
+        year_values = data['year'].to_numpy()[mask]
+        count('rows_pivoted', len(year_values))
+        self.years = np.unique(year_values)
+        self.iso_codes, iso_index = np.unique(iso.to_numpy()[mask].astype(str), return_inverse=True)
+        year_index = np.searchsorted(self.years, year_values)
+        self._year_position = {year: i for i, year in enumerate(self.years.tolist())}
+
+        self._encoders = {}
+        self.matrices = {}
+        for metric in metrics:
+            matrix = np.full((len(self.years), len(self.iso_codes)), np.nan)
+            matrix[year_index, iso_index] = data[metric].to_numpy(dtype=np.float64)[mask]
+            self.matrices[metric] = matrix
+
+    def _grow(self, years, iso_codes):
+        """Add rows for new years and columns for new ISO codes, filled with NaN."""
+        all_years = np.union1d(self.years, years)
+        all_codes = np.union1d(self.iso_codes, iso_codes)
+        if len(all_years) == len(self.years) and len(all_codes) == len(self.iso_codes):
+            return
+        rows = np.searchsorted(all_years, self.years)
+        columns = np.searchsorted(all_codes, self.iso_codes)
+        for metric, matrix in self.matrices.items():
+            grown = np.full((len(all_years), len(all_codes)), np.nan)
+            grown[np.ix_(rows, columns)] = matrix
+            self.matrices[metric] = grown
+        self.years, self.iso_codes = all_years, all_codes
+        self._encoders = {}
+        self._year_position = {year: i for i, year in enumerate(self.years.tolist())}
+
+    def apply(self, changes):
+        """Write the rows of a refresh.Changes into the matrices.
+
+        Only the changed cells are touched; the matrices grow when new years
+        or countries appear. Returns {metric: {year: ISO codes}} of the cells
+        whose value actually changed.
+        """
+        rows = pd.concat([changes.upserts, changes.removed], ignore_index=True)
+        iso = self.resolver.resolve(rows['country'])
+        mask = iso.notna().to_numpy()
+        years = rows['year'].to_numpy()[mask]
+        codes = iso.to_numpy()[mask].astype(str)
+        self._grow(np.unique(years), np.unique(codes))
+        year_index = np.searchsorted(self.years, years)
+        iso_index = np.searchsorted(self.iso_codes, codes)
+
+        changed = {}
+        for metric, matrix in self.matrices.items():
+            if metric not in rows:
+                continue
+            new = rows[metric].to_numpy(dtype=np.float64)[mask]
+            old = matrix[year_index, iso_index]
+            differs = ~((old == new) | (np.isnan(old) & np.isnan(new)))
+            matrix[year_index, iso_index] = new
+            by_year = {}
+            for year, code in zip(years[differs].tolist(), codes[differs].tolist()):
+                by_year.setdefault(year, []).append(code)
+            changed[metric] = by_year
+        return changed
+
+    def values(self, year, metric):
+        """Values of every ISO code for one year (a view, NaN where missing).
+
+        A year without any country row gives an all-NaN row, i.e. an empty map.
+        """
+        position = self._year_position.get(year)
+        if position is None:
+            return np.full(len(self.iso_codes), np.nan)
+        return self.matrices[metric][position]
+
+    def series(self, year, metric):
+        """ISO codes and values for one year, without the missing entries."""
+        values = self.values(year, metric)
+        present = ~np.isnan(values)
+        return self.iso_codes[present], values[present]
+
+    def encoder(self, key_field='ISO_A3'):
+        """RecordEncoder over the ISO codes, shared by every payload keyed by ``key_field``."""
+        if key_field not in self._encoders:
+            self._encoders[key_field] = RecordEncoder(self.iso_codes, key_field)
+        return self._encoders[key_field]
+
+    def records(self, year, metric):
+        """Region values for MapChart.invalidate_region_values()."""
+        values = self.values(year, metric)
+        return self.encoder().encode(values, ~np.isnan(values))
+
+    def frame(self, metric):
+        """The matrix of one metric as a DataFrame (years x ISO codes)."""
+        return pd.DataFrame(self.matrices[metric], index=self.years, columns=self.iso_codes)
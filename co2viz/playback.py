@@ -0,0 +1,147 @@
+import threading
+import time
+
+import numpy as np
+
+from co2viz.timing import span
+
+
+class Playback:
+    """Stream entity series into live line series at a fixed rate.
+
+    ``series`` is the {entity: (years, values)} mapping returned by
+    entity_series(). Data is sent one frame at a time: every frame adds the
+    years that became due since the previous frame, for all entities at
+    once, with one bulk ``add`` call per series. The rate is given either
+    in years per second or in points per second.
+    """
+
+    def __init__(self, line_series_dict, series, years_per_second=None, points_per_second=None, frame_rate=60):
+        if (years_per_second is None) == (points_per_second is None):
+            raise ValueError('Pass exactly one of years_per_second or points_per_second')
+        self.line_series_dict = line_series_dict
+        self.series = series
+        self.years_per_second = years_per_second
+        self.points_per_second = points_per_second
+        self.frame_rate = frame_rate
+
+        # Shared year axis, and for every entity the number of its points up to each year
+        self.years = np.unique(np.concatenate([years for years, _ in series.values()])) if series else np.array([])
+        self._bounds = {
+            entity: np.concatenate([[0], np.searchsorted(years, self.years, side='right')])
+            for entity, (years, _) in series.items()
+        }
+        self._cumulative_points = sum(self._bounds.values()) if series else np.zeros(1, dtype=np.int64)
+
+        self._position = 0  # Number of years already sent
+        self._clock = 0.0  # Playback time matching the current position
+        self._lock = threading.Lock()
+        self._playing = threading.Event()
+        self._playing.set()
+        self._stopped = False
+        self._thread = None
+
+        self.points_sent = 0
+        self.frames_sent = 0
+        self.active_seconds = 0.0
+
+    @property
+    def current_year(self):
+        return self.years[self._position - 1] if self._position else None
+
+    @property
+    def finished(self):
+        return self._position >= len(self.years)
+
+    def _time_for(self, position):
+        if self.years_per_second is not None:
+            return position / self.years_per_second
+        return self._cumulative_points[position] / self.points_per_second
+
+    def _target_position(self):
+        if self.years_per_second is not None:
+            target = int(self._clock * self.years_per_second)
+        else:
+            budget = self._clock * self.points_per_second
+            target = int(np.searchsorted(self._cumulative_points, budget, side='right')) - 1
+        return min(target, len(self.years))
+
+    def _send(self, start, stop):
+        for entity, (years, values) in self.series.items():
+            bounds = self._bounds[entity]
+            lo, hi = bounds[start], bounds[stop]
+            if hi > lo:
+                self.line_series_dict[entity].add(years[lo:hi].tolist(), values[lo:hi].tolist())
+                self.points_sent += int(hi - lo)
+
+    def run(self):
+        """Play until all years are sent or stop() is called (blocking)."""
+        frame_time = 1.0 / self.frame_rate
+        last = time.perf_counter()
+        while not self._stopped and not self.finished:
+            if not self._playing.is_set():
+                self._playing.wait()
+                last = time.perf_counter()
+                continue
+            now = time.perf_counter()
+            elapsed = now - last
+            last = now
+            with self._lock:
+                self._clock += elapsed
+                self.active_seconds += elapsed
+                target = self._target_position()
+                if target > self._position:
+                    with span('playback.frame', years=target - self._position):
+                        self._send(self._position, target)
+                    self._position = target
+                    self.frames_sent += 1
+            time.sleep(max(0.0, frame_time - (time.perf_counter() - now)))
+
+    def start(self):
+        """Play in a background thread."""
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def pause(self):
+        self._playing.clear()
+
+    def resume(self):
+        self._playing.set()
+
+    def stop(self):
+        self._stopped = True
+        self._playing.set()
+
+    def seek(self, year):
+        """Jump so that every point up to and including ``year`` is shown."""
+        with self._lock:
+            position = int(np.searchsorted(self.years, year, side='right'))
+            if position < self._position:
+                # Going back: redraw the series from scratch up to the new position
+                for line_series in self.line_series_dict.values():
+                    line_series.clear()
+                self._send(0, position)
+            elif position > self._position:
+                self._send(self._position, position)
+            self._position = position
+            self._clock = self._time_for(position)
+
+    def stats(self):
+        seconds = self.active_seconds or float('nan')
+        return {
+            'points': self.points_sent,
+            'frames': self.frames_sent,
+            'seconds': self.active_seconds,
+            'points_per_second': self.points_sent / seconds,
+            'frames_per_second': self.frames_sent / seconds,
+        }
+
+    def report(self):
+        stats = self.stats()
+        return (f"Sent {stats['points']} points in {stats['frames']} frames over {stats['seconds']:.2f} s "
+                f"({stats['points_per_second']:.0f} points/s, {stats['frames_per_second']:.1f} frames/s)")
@@ -0,0 +1,116 @@
+import time
+
+import numpy as np
+
+from co2viz.timing import span
+
+
+class RankingIndex:
+    """Top-N countries of every year and metric of a PivotStore.
+
+    Built with one partial sort (argpartition) per metric over the whole
+    year x country matrix, followed by a full sort of the N selected
+    columns only; a lookup afterwards is a row of precomputed indices.
+    Missing values never rank.
+    """
+
+    def __init__(self, store, metrics=None, n=30):
+        self.store = store
+        self.n = min(n, len(store.iso_codes))
+        self.order = {}
+        self.counts = {}
+        for metric in metrics or list(store.matrices):
+            matrix = store.matrices[metric]
+            ranked = np.where(np.isnan(matrix), -np.inf, matrix)
+            # Unordered top-n of every row, then sort only those n columns, largest first
+            top = np.argpartition(ranked, -self.n, axis=1)[:, -self.n:]
+            top_values = np.take_along_axis(ranked, top, axis=1)
+            self.order[metric] = np.take_along_axis(top, np.argsort(-top_values, axis=1, kind='stable'), axis=1)
+            self.counts[metric] = np.minimum((~np.isnan(matrix)).sum(axis=1), self.n)
+
+    def top_indices(self, year, metric, n=None):
+        """Column indices in the store of the ``n`` largest values of one year, largest first.
+
+        Empty for a year without any country row.
+        """
+        n = self.n if n is None else n
+        if n > self.n and self.n < len(self.store.iso_codes):
+            raise ValueError(f'the index holds the top {self.n} only, got n={n}')
+        row = self.store._year_position.get(year)
+        if row is None:
+            return np.empty(0, dtype=np.intp)
+        return self.order[metric][row, :min(n, self.counts[metric][row])]
+
+    def top(self, year, metric, n=None):
+        """ISO codes and values of the ``n`` largest values of one year, largest first."""
+        indices = self.top_indices(year, metric, n)
+        return self.store.iso_codes[indices], self.store.values(year, metric)[indices]
+
+    def bar_data(self, year, metric, n=None):
+        """Bars for BarChart.set_data(), largest first."""
+        return self.store.encoder('category').encode(self.store.values(year, metric), self.top_indices(year, metric, n))
+
+
+class BarChartRace:
+    """Animate a BarChart through the yearly rankings of a RankingIndex.
+
+    Every frame sends the whole top N of its year, and the chart re-sorts
+    the bars itself. A frame holding only the changed bars would leave a
+    country that dropped out of the ranking on screen, since the chart has
+    no call to remove a single bar.
+    """
+
+    def __init__(self, chart, ranking, metric, years=None, n=None, frame_rate=10, title=None):
+        self.chart = chart
+        self.ranking = ranking
+        self.metric = metric
+        self.years = list(ranking.store.years if years is None else years)
+        self.n = n
+        self.frame_rate = frame_rate
+        self.title = title
+
+        self.frames_sent = 0
+        self.bars_sent = 0
+        self.bytes_sent = 0
+        self.seconds = 0.0
+
+    def frames(self):
+        """Yield (year, values, indices): the store columns of each year's top N, largest first."""
+        store = self.ranking.store
+        for year in self.years:
+            yield year, store.values(year, self.metric), self.ranking.top_indices(year, self.metric, self.n)
+
+    def run(self):
+        """Play all frames at ``frame_rate`` frames per second (blocking)."""
+        encoder = self.ranking.store.encoder('category')
+        frame_time = 1.0 / self.frame_rate
+        start = time.perf_counter()
+        for year, values, indices in self.frames():
+            frame_start = time.perf_counter()
+            with span('bar_chart_race.frame', year=year):
+                # Bars are encoded from the typed arrays only when the frame is sent
+                bars = encoder.encode(values, indices)
+                self.chart.set_data(bars)
+                if self.title:
+                    self.chart.set_title(self.title.format(year=year))
+            self.frames_sent += 1
+            self.bars_sent += len(bars)
+            self.bytes_sent += encoder.measure(bars)
+            time.sleep(max(0.0, frame_time - (time.perf_counter() - frame_start)))
+        self.seconds = time.perf_counter() - start
+
+    def stats(self):
+        frames = self.frames_sent or float('nan')
+        return {
+            'frames': self.frames_sent,
+            'seconds': self.seconds,
+            'frames_per_second': self.frames_sent / (self.seconds or float('nan')),
+            'bars_per_frame': self.bars_sent / frames,
+            'bytes_per_frame': self.bytes_sent / frames,
+        }
+
+    def report(self):
+        stats = self.stats()
+        return (f"Played {stats['frames']} frames in {stats['seconds']:.2f} s "
+                f"({stats['frames_per_second']:.1f} frames/s), "
+                f"{stats['bars_per_frame']:.1f} bars and {stats['bytes_per_frame']:.0f} payload bytes per frame")
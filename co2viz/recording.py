@@ -0,0 +1,180 @@
+"""In-process chart backend that records instead of drawing.
+
+Every call on a chart, dashboard or series is counted, together with the
+number of data points and the JSON size of the payloads that a real chart
+would have been sent. Used by the benchmarks and for headless runs
+(CO2VIZ_BACKEND=recording).
+"""
+import json
+from collections import Counter
+
+
+def _payload_size(payload):
+    return len(json.dumps(payload, default=str))
+
+
+class _Recorded:
+    kind = 'object'
+
+    def __init__(self, backend):
+        self._backend = backend
+        self._record('create')
+
+    def _record(self, method, payload=None, count=0):
+        self._backend.record(f'{self.kind}.{method}', payload, count)
+
+    def __getattr__(self, name):
+        # Styling and layout calls (set_name, set_line_color, add_legend, ...) are only counted
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        def method(*args, **kwargs):
+            self._record(name)
+            return self
+        return method
+
+
+class LineSeries(_Recorded):
+    kind = 'LineSeries'
+
+    def add(self, x, y=None):
+        count = len(x) if isinstance(x, (list, tuple)) else 1
+        self._record('add', [x, y], count)
+        return self
+
+    def clear(self):
+        self._record('clear')
+        return self
+
+
+class Axis(_Recorded):
+    kind = 'Axis'
+
+    def __init__(self, backend):
+        super().__init__(backend)
+        self.handlers = {}
+
+    def add_event_listener(self, event, handler=None, throttle_ms=0, once=False):
+        self._record('add_event_listener')
+        if handler is not None:
+            self.handlers.setdefault(event, []).append(handler)
+        return event
+
+    def set_interval(self, start, end, *args, **kwargs):
+        # Behaves like a user zoom: the interval change listeners are called
+        self._record('set_interval')
+        for handler in self.handlers.get('intervalchange', []):
+            handler({'start': start, 'end': end})
+        return self
+
+
+class ChartXY(_Recorded):
+    kind = 'ChartXY'
+
+    def __init__(self, backend):
+        super().__init__(backend)
+        self.series = []
+        self.x_axis = Axis(backend)
+        self.y_axis = Axis(backend)
+
+    def add_line_series(self, *args, **kwargs):
+        self._record('add_line_series')
+        line_series = LineSeries(self._backend)
+        self.series.append(line_series)
+        return line_series
+
+    def get_default_x_axis(self):
+        return self.x_axis
+
+    def get_default_y_axis(self):
+        return self.y_axis
+
+
+class MapChart(_Recorded):
+    kind = 'MapChart'
+
+    def invalidate_region_values(self, region_values):
+        self._record('invalidate_region_values', region_values, len(region_values))
+        return self
+
+    def set_palette_colors(self, steps, **kwargs):
+        self._record('set_palette_colors', steps, len(steps))
+        return self
+
+
+class BarChart(_Recorded):
+    kind = 'BarChart'
+
+    def set_data(self, data):
+        self._record('set_data', data, len(data))
+        return self
+
+
+class Dashboard(_Recorded):
+    kind = 'Dashboard'
+
+    def __init__(self, backend):
+        super().__init__(backend)
+        self.charts = []
+
+    def _add(self, chart):
+        self.charts.append(chart)
+        return chart
+
+    def ChartXY(self, *args, **kwargs):
+        return self._add(ChartXY(self._backend))
+
+    def MapChart(self, *args, **kwargs):
+        return self._add(MapChart(self._backend))
+
+    def BarChart(self, *args, **kwargs):
+        return self._add(BarChart(self._backend))
+
+
+class RecordingBackend:
+    """Chart backend whose charts only count calls, points and payload bytes."""
+
+    name = 'recording'
+
+    def __init__(self, measure_bytes=True):
+        self.measure_bytes = measure_bytes
+        self.calls = Counter()
+        self.points = Counter()
+        self.payload_bytes = Counter()
+
+    def record(self, key, payload=None, count=0):
+        self.calls[key] += 1
+        if count:
+            self.points[key] += count
+        if payload is not None and self.measure_bytes:
+            self.payload_bytes[key] += _payload_size(payload)
+
+    def reset(self):
+        self.calls.clear()
+        self.points.clear()
+        self.payload_bytes.clear()
+
+    def summary(self):
+        return {
+            'calls': dict(self.calls),
+            'points': dict(self.points),
+            'payload_bytes': dict(self.payload_bytes),
+        }
+
+    def set_license(self, license_key):
+        self.record('set_license')
+
+    def color(self, value):
+        return value
+
+    def chart_xy(self, title, theme='white'):
+        return ChartXY(self)
+
+    def dashboard(self, rows, columns, theme='white'):
+        return Dashboard(self)
+
+    def map_chart(self, theme='white'):
+        return MapChart(self)
+
+    def bar_chart(self, vertical=True, theme='white'):
+        return BarChart(self)
@@ -0,0 +1,173 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from co2viz.data import CACHED_COLUMNS, DEFAULT_PATH, _load_from_cache, read_cache, read_csv_columns, write_cache
+
+KEY = ['country', 'year']
+
+# The CSV parser is not exactly round-trip, so rewritten but equal values can differ in the last bits
+RELATIVE_TOLERANCE = 1e-12
+
+
+class Changes:
+    """Rows of a new dataset version that differ from the previous one, by (country, year).
+
+    ``upserts`` holds the new and changed rows with their new values;
+    ``removed`` holds the keys that disappeared, with NaN values.
+    """
+
+    def __init__(self, upserts, removed, added_count, columns):
+        self.upserts = upserts
+        self.removed = removed
+        self.added_count = added_count
+        self.columns = columns
+        self._by_entity = None
+
+    def __len__(self):
+        return len(self.upserts) + len(self.removed)
+
+    def entity_rows(self, entity):
+        """New values of one entity's changed rows (NaN for removed rows), sorted by year."""
+        if self._by_entity is None:
+            rows = pd.concat([self.upserts, self.removed], ignore_index=True).sort_values('year')
+            self._by_entity = {entity: group for entity, group in rows.groupby('country', sort=False)}
+        return self._by_entity.get(entity, self.upserts.iloc[:0])
+
+    def report(self):
+        return (f"{self.added_count} new, {len(self.upserts) - self.added_count} changed "
+                f"and {len(self.removed)} removed rows")
+
+
+def diff_frames(old, new, columns=None):
+    """Compare two dataset versions by (country, year); NaN equals NaN, values within RELATIVE_TOLERANCE are equal."""
+    columns = [c for c in (columns or new.columns) if c not in KEY and c in old and c in new]
+    old = old[KEY + columns].astype({'country': object})
+    new = new[KEY + columns].astype({'country': object})
+    merged = old.merge(new, on=KEY, how='outer', suffixes=('_old', ''), indicator=True)
+
+    added = (merged['_merge'] == 'right_only').to_numpy()
+    removed = (merged['_merge'] == 'left_only').to_numpy()
+    changed = np.zeros(len(merged), dtype=bool)
+    for column in columns:
+        before = merged[column + '_old'].to_numpy(dtype=np.float64)
+        after = merged[column].to_numpy(dtype=np.float64)
+        changed |= ~np.isclose(before, after, rtol=RELATIVE_TOLERANCE, atol=0.0, equal_nan=True)
+    changed &= ~added & ~removed
+
+    upserts = merged.loc[added | changed, KEY + columns].reset_index(drop=True)
+    gone = merged.loc[removed, KEY].reset_index(drop=True)
+    for column in columns:
+        gone[column] = np.nan
+    return Changes(upserts, gone, int(added.sum()), columns)
+
+
+def refresh_dataset(path=DEFAULT_PATH, columns=CACHED_COLUMNS):
+    """Diff the CSV at ``path`` against its cached version and update the cache.
+
+    Returns (data, changes): the new dataset, loaded as by load_dataset(),
+    and the Changes against the previously cached version (every row is
+    new when there was no cache).
+    """
+    columns = list(columns)
+    # Still memory-mapped: write_cache() puts the new version next to the old files
+    previous = read_cache(path)
+    frame = read_csv_columns(path, columns)
+    columns = [c for c in columns if c in frame.columns]
+    if previous is None:
+        previous = frame.iloc[:0]
+    changes = diff_frames(previous, frame, columns)
+    return _load_from_cache(write_cache(path, frame), columns), changes
+
+
+def source_changed(path, seen):
+    """True when the file's (size, mtime) differs from ``seen``, a dict updated in place."""
+    stat = os.stat(path)
+    signature = (stat.st_size, stat.st_mtime_ns)
+    if seen.get(path) == signature:
+        return False
+    first = path not in seen
+    seen[path] = signature
+    return not first
+
+
+class LineUpdater:
+    """Push the changes of a dataset refresh to the open line series of a chart.
+
+    Points after the last plotted year are appended; a series with an
+    earlier point changed or removed is cleared and sent again.
+    """
+
+    def __init__(self, line_series_dict, series, value_column='co2', scale=1.0):
+        self.line_series_dict = line_series_dict
+        self.series = series
+        self.value_column = value_column
+        self.scale = scale
+        self.points_sent = 0
+
+    def apply(self, changes, store_changes=None):
+        """Send the changed points of ``changes``; returns the number of points sent."""
+        sent = 0
+        for entity, line_series in self.line_series_dict.items():
+            rows = changes.entity_rows(entity)
+            if rows.empty or self.value_column not in rows:
+                continue
+            years, values = self.series.get(entity, (np.empty(0), np.empty(0)))
+            new_years = rows['year'].to_numpy(dtype=np.float64)
+            new_values = rows[self.value_column].to_numpy(dtype=np.float64) / self.scale
+            if not len(years) or new_years[0] > years[-1]:
+                present = ~np.isnan(new_values)
+                line_series.add(new_years[present].tolist(), new_values[present].tolist())
+                years, values = np.append(years, new_years[present]), np.append(values, new_values[present])
+                sent += int(present.sum())
+            else:
+                merged = dict(zip(years.tolist(), values.tolist()))
+                merged.update(zip(new_years.tolist(), new_values.tolist()))
+                years = np.array(sorted(year for year, value in merged.items() if value == value))
+                values = np.array([merged[year] for year in years.tolist()])
+                line_series.clear()
+                line_series.add(years.tolist(), values.tolist())
+                sent += len(years)
+            self.series[entity] = (years, values)
+        self.points_sent += sent
+        return sent
+
+
+class MapUpdater:
+    """Re-invalidate the changed regions of an open MapChart showing one (year, metric)."""
+
+    def __init__(self, chart, store, year, metric):
+        self.chart = chart
+        self.store = store
+        self.year = year
+        self.metric = metric
+        self.regions_sent = 0
+
+    def apply(self, changes, store_changes):
+        """Send the regions listed in ``store_changes``, the result of PivotStore.apply()."""
+        codes = store_changes.get(self.metric, {}).get(self.year, [])
+        if not codes:
+            return 0
+        positions = np.searchsorted(self.store.iso_codes, codes)
+        payload = self.store.encoder().encode(self.store.values(self.year, self.metric), positions)
+        self.chart.invalidate_region_values(payload)
+        self.regions_sent += len(payload)
+        return len(payload)
+
+
+def watch(path, on_change, interval=5.0, stop=None):
+    """Poll ``path`` every ``interval`` seconds and call on_change() when it is rewritten.
+
+    Runs until ``stop()`` returns True, or until interrupted with Ctrl+C.
+    """
+    seen = {}
+    source_changed(path, seen)
+    try:
+        while not (stop and stop()):
+            time.sleep(interval)
+            if source_changed(path, seen):
+                on_change()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,83 @@
+import pandas as pd
+
+from co2viz.data import is_additive
+
+# Derived entities that are not rows of the OWID dataset, as sums of existing entities
+REGIONS = {
+    'Americas': ['North America', 'South America'],
+    'G7': ['Canada', 'France', 'Germany', 'Italy', 'Japan', 'United Kingdom', 'United States'],
+}
+
+
+def parse_region(text):
+    """Parse 'Americas = North America + South America' into (name, members)."""
+    name, sep, members = text.partition('=')
+    if not sep:
+        raise ValueError(f"Region definition needs a '=': {text!r}")
+    members = [member.strip() for member in members.split('+') if member.strip()]
+    if not name.strip() or not members:
+        raise ValueError(f"Region definition needs a name and at least one member: {text!r}")
+    return name.strip(), members
+
+
+def parse_regions(definitions):
+    """Normalize {name: members}, 'name = a + b' strings or a list of those to {name: members}."""
+    if isinstance(definitions, str):
+        definitions = [definitions]
+    if isinstance(definitions, dict):
+        return {name: list(members) for name, members in definitions.items()}
+    return dict(parse_region(text) for text in definitions)
+
+
+class RegionAggregator:
+    """Compute derived regions (sums of member entities) per year.
+
+    All regions that are not cached yet are computed together in one
+    groupby over the member rows. Results are memoized per
+    (region definition, metric) and returned in the dataset's own long
+    format (country, year, metric), so the chart code can use them like
+    any other entity.
+    """
+
+    def __init__(self, data, definitions=REGIONS):
+        self.data = data
+        self.definitions = parse_regions(definitions)
+        self._cache = {}
+
+    def define(self, definition, members=None):
+        """Add a region, either as define('G2', ['China', 'United States']) or define('G2 = China + United States')."""
+        name, members = (definition, list(members)) if members is not None else parse_region(definition)
+        self.definitions[name] = members
+        return name
+
+    def _key(self, name, metric):
+        return name, tuple(self.definitions[name]), metric
+
+    def _aggregate(self, names, metric):
+        membership = pd.DataFrame(
+            [(member, name) for name in names for member in self.definitions[name]],
+            columns=['country', 'region']
+        )
+        rows = self.data.loc[self.data['country'].isin(membership['country']), ['country', 'year', metric]]
+        rows = rows.astype({'country': str}).merge(membership, on='country')
+        totals = rows.groupby(['region', 'year'], sort=True)[metric].sum(min_count=1).reset_index()
+        for name, frame in totals.groupby('region', sort=False):
+            self._cache[self._key(name, metric)] = frame.rename(columns={'region': 'country'}).reset_index(drop=True)
+        # Regions without any member rows still get an (empty) cache entry, typed like the others
+        empty = totals.iloc[:0].rename(columns={'region': 'country'})
+        for name in names:
+            self._cache.setdefault(self._key(name, metric), empty)
+
+    def compute(self, metric, names=None):
+        """Return the yearly totals of ``metric`` for the given (default: all) regions.
+
+        Only additive metrics can be summed over members; a per capita value
+        or a share raises ValueError.
+        """
+        if not is_additive(metric):
+            raise ValueError(f'{metric} is not additive, so a region total of its members would be wrong')
+        names = list(self.definitions) if names is None else list(names)
+        missing = [name for name in names if self._key(name, metric) not in self._cache]
+        if missing:
+            self._aggregate(missing, metric)
+        return pd.concat([self._cache[self._key(name, metric)] for name in names], ignore_index=True)
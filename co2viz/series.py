@@ -0,0 +1,52 @@
+import time
+
+import numpy as np
+
+
+def entity_series(data, entities, value_column='co2', scale=1.0):
+    """Group the dataset once and return {entity: (years, values)} arrays.
+
+    Rows with a missing year or value are dropped and values are divided by
+    ``scale`` (e.g. 1e6 for million metric tons). Entities appear in the
+    order they first occur in the data.
+    """
+    subset = data[data['country'].isin(entities)]
+    subset = subset[subset['year'].notna() & subset[value_column].notna()]
+    series = {}
+    for entity, group in subset.groupby('country', observed=True, sort=False):
+        years = group['year'].to_numpy(dtype=np.float64)
+        values = group[value_column].to_numpy(dtype=np.float64) / scale
+        series[entity] = (years, values)
+    return series
+
+
+def interpolate_series(series, steps_per_year=12):
+    """Linearly interpolate every entity of entity_series() to ``steps_per_year`` points per year."""
+    interpolated = {}
+    for entity, (years, values) in series.items():
+        if len(years) < 2:
+            interpolated[entity] = (years, values)
+            continue
+        fine_years = np.arange(years[0], years[-1] + 1e-9, 1.0 / steps_per_year)
+        interpolated[entity] = (fine_years, np.interp(fine_years, years, values))
+    return interpolated
+
+
+def add_series_data(line_series_dict, series, per_point=False, delay=0.0, verbose=False):
+    """Push the arrays from entity_series() to the chart's line series.
+
+    By default each entity is sent with a single bulk ``add(xs, ys)`` call.
+    ``per_point=True`` keeps the old point-by-point drawing for animations,
+    optionally sleeping ``delay`` seconds and printing every point.
+    """
+    for entity, (years, values) in series.items():
+        line_series = line_series_dict[entity]
+        if not per_point:
+            line_series.add(years.tolist(), values.tolist())
+            continue
+        for year, value in zip(years.tolist(), values.tolist()):
+            if verbose:
+                print(f"Adding data for {entity}: Year={year}, Emission={value}")
+            line_series.add(year, value)
+            if delay:
+                time.sleep(delay)
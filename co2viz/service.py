@@ -0,0 +1,280 @@
+"""Local HTTP query service over the preprocessed dataset.
+
+    python -m co2viz serve --port 8000
+
+The dataset, the pivot store, the top-N index and the region totals are
+built once when the service starts and stay in memory; every response is
+computed from them and kept in an LRU cache. All responses are JSON:
+
+    GET /meta                                  years, metrics and endpoints
+    GET /continents?metric=co2                 yearly series of every continent (total metrics only)
+    GET /top?year=2022&metric=co2&n=30         largest emitters of one year
+    GET /map?year=2022&metric=co2              value of every country in one year
+    GET /breakdown                             world fossil fuel, land-use change and total emissions
+    GET /stats                                 response cache statistics (not cached)
+
+Values are in the dataset's units; years without data are left out.
+"""
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlsplit
+
+from co2viz.timing import count
+
+# Responses kept by the LRU cache
+DEFAULT_CACHE_SIZE = 1024
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8000
+
+# Columns of the world breakdown, as in three_types_chart()
+BREAKDOWN_COLUMNS = ['co2', 'land_use_change_co2', 'co2_including_luc']
+
+# Metrics served by /continents: the derived Americas region is a sum of its members, which is
+# only meaningful for totals (a sum of per capita values is not the per capita value of the sum)
+CONTINENT_METRICS = ['co2', 'co2_including_luc', 'land_use_change_co2']
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}
+
+
+class QueryError(Exception):
+    """A request that cannot be answered; ``status`` is the HTTP status sent back."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _encode(document):
+    return json.dumps(document, separators=(',', ':')).encode()
+
+
+class ResponseCache:
+    """Encoded responses by normalized query, evicting the least recently used."""
+
+    def __init__(self, size=DEFAULT_CACHE_SIZE):
+        self.size = size
+        self._responses = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build):
+        """The cached response of ``key``, or ``build()`` encoded and cached."""
+        if key in self._responses:
+            self._responses.move_to_end(key)
+            self.hits += 1
+            count('response_cache_hits')
+            return self._responses[key]
+        self.misses += 1
+        count('response_cache_misses')
+        body = _encode(build())
+        self._responses[key] = body
+        if len(self._responses) > self.size:
+            self._responses.popitem(last=False)
+        return body
+
+    def clear(self):
+        self._responses.clear()
+
+    def stats(self):
+        return {'size': len(self._responses), 'capacity': self.size, 'hits': self.hits, 'misses': self.misses}
+
+
+class QueryIndex:
+    """The queries of the service, answered from the lookup structures of a Session."""
+
+    def __init__(self, session, n=30):
+        from co2viz.charts import CONTINENT_ENTITIES
+
+        self.session = session
+        self.n = n
+        self.continent_entities = CONTINENT_ENTITIES
+        self.metrics = list(session.store.matrices)
+        self.continent_metrics = [metric for metric in CONTINENT_METRICS if metric in session.data]
+        self.warm()
+
+    def warm(self):
+        """Build the pivot store, the top-N index, the continent series and the world breakdown up front."""
+        from co2viz.series import entity_series
+
+        self.session.ranking(self.n)
+        data = self.session.data
+        self._continents = {}
+        for metric in self.continent_metrics:
+            series = entity_series(data, self.continent_entities, metric)
+            series.update(entity_series(self.session.regions.compute(metric, names=['Americas']), ['Americas'], metric))
+            self._continents[metric] = {
+                entity: {'years': years.astype(int).tolist(), 'values': values.tolist()}
+                for entity in self.continent_entities if entity in series
+                for years, values in [series[entity]]
+            }
+        self._breakdown = None
+        if all(column in data for column in BREAKDOWN_COLUMNS):
+            world = data.loc[data['country'] == 'World', ['year'] + BREAKDOWN_COLUMNS].dropna()
+            self._breakdown = {'years': world['year'].astype(int).tolist()}
+            self._breakdown.update({column: world[column].tolist() for column in BREAKDOWN_COLUMNS})
+
+    def _metric(self, params, metrics):
+        metric = params.get('metric', 'co2')
+        if metric not in metrics:
+            raise QueryError(f'unknown metric {metric!r}, expected one of {metrics}')
+        return metric
+
+    def _year(self, params):
+        try:
+            year = int(params['year'])
+        except KeyError:
+            raise QueryError('missing parameter year') from None
+        except ValueError:
+            raise QueryError(f"year must be an integer, got {params['year']!r}") from None
+        if year not in self.session.store._year_position:
+            raise QueryError(f'no data for year {year}', 404)
+        return year
+
+    def key(self, path, params):
+        """Normalized cache key of a query; raises QueryError for invalid queries."""
+        if path == '/continents':
+            return path, self._metric(params, self.continent_metrics)
+        if path == '/top':
+            try:
+                n = int(params.get('n', self.n))
+            except ValueError:
+                raise QueryError(f"n must be an integer, got {params['n']!r}") from None
+            if not 0 < n <= self.n:
+                raise QueryError(f'n must be between 1 and {self.n}')
+            return path, self._year(params), self._metric(params, self.metrics), n
+        if path == '/map':
+            return path, self._year(params), self._metric(params, self.metrics)
+        if path in ('/meta', '/breakdown'):
+            return (path,)
+        raise QueryError(f'no such endpoint {path!r}', 404)
+
+    def answer(self, key):
+        """The JSON document of a normalized query."""
+        return getattr(self, key[0].lstrip('/'))(*key[1:])
+
+    def meta(self):
+        store = self.session.store
+        return {
+            'years': store.years.tolist(),
+            'metrics': self.metrics,
+            'continent_metrics': self.continent_metrics,
+            'top_n': self.n,
+            'endpoints': ['/meta', '/continents', '/top', '/map', '/breakdown', '/stats'],
+        }
+
+    def continents(self, metric):
+        return {'metric': metric, 'series': self._continents[metric]}
+
+    def top(self, year, metric, n):
+        codes, values = self.session.ranking(self.n).top(year, metric, n)
+        return {
+            'year': year, 'metric': metric,
+            'countries': [{'ISO_A3': code, 'value': value} for code, value in zip(codes.tolist(), values.tolist())],
+        }
+
+    def map(self, year, metric):
+        return {'year': year, 'metric': metric, 'regions': self.session.store.records(year, metric)}
+
+    def breakdown(self):
+        if self._breakdown is None:
+            raise QueryError(f'the dataset lacks one of the {", ".join(BREAKDOWN_COLUMNS)} columns', 404)
+        return self._breakdown
+
+
+class QueryService:
+    """asyncio HTTP/1.1 server answering QueryIndex queries through a ResponseCache.
+
+    Keeps connections alive between requests. Queries are answered on the
+    event loop: a cached response is a dict lookup, and an uncached one
+    a few array lookups over the precomputed indexes.
+    """
+
+    def __init__(self, session, cache_size=DEFAULT_CACHE_SIZE, n=30):
+        self.index = QueryIndex(session, n=n)
+        self.cache = ResponseCache(cache_size)
+        self.requests = 0
+
+    def respond(self, target):
+        """(status, body) of a GET of ``target`` (path and query string)."""
+        url = urlsplit(target)
+        params = dict(parse_qsl(url.query))
+        if url.path == '/stats':
+            return 200, _encode({'requests': self.requests, 'cache': self.cache.stats()})
+        try:
+            key = self.index.key(url.path, params)
+            return 200, self.cache.get(key, lambda: self.index.answer(key))
+        except QueryError as error:
+            return error.status, _encode({'error': str(error)})
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length_error = None
+                if 'content-length' in headers:
+                    length = headers['content-length']
+                    if length.isascii() and length.isdigit():
+                        await reader.readexactly(int(length))
+                    else:
+                        # The end of the body is unknown, so the connection cannot be reused
+                        length_error = f'invalid Content-Length {length!r}'
+
+                self.requests += 1
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    status, body, version = 400, _encode({'error': 'malformed request line'}), 'HTTP/1.1'
+                    headers['connection'] = 'close'
+                else:
+                    if length_error:
+                        status, body = 400, _encode({'error': length_error})
+                        headers['connection'] = 'close'
+                    elif method == 'GET':
+                        status, body = self.respond(target)
+                    else:
+                        status, body = 405, _encode({'error': f'method {method} not allowed'})
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        server = await asyncio.start_server(self.handle, host, port)
+        address = server.sockets[0].getsockname()
+        print(f"Serving CO2 queries on http://{address[0]}:{address[1]} (Ctrl+C to stop)", flush=True)
+        async with server:
+            await server.serve_forever()
+
+
+def serve(session, host=DEFAULT_HOST, port=DEFAULT_PORT, cache_size=DEFAULT_CACHE_SIZE, n=30):
+    """Precompute the indexes of ``session`` and answer queries until Ctrl+C."""
+    start = time.perf_counter()
+    service = QueryService(session, cache_size=cache_size, n=n)
+    print(f"Indexes built in {(time.perf_counter() - start) * 1000:.1f} ms")
+    try:
+        asyncio.run(service.serve(host, port))
+    except KeyboardInterrupt:
+        pass
+    return service
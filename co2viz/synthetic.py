@@ -0,0 +1,80 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+# Approximate number of rows of the published owid-co2-data.csv
+REAL_ROWS = 50_000
+
+LAST_YEAR = 2022
+
+# Aggregate entities as they appear in the OWID data (no ISO code)
+AGGREGATES = [
+    'World', 'Africa', 'Asia', 'Europe', 'North America', 'South America', 'Oceania',
+    'Africa (GCP)', 'Asia (GCP)', 'Europe (GCP)', 'North America (GCP)', 'South America (GCP)', 'Oceania (GCP)',
+    'European Union (27)', 'High-income countries', 'Low-income countries', 'Lower-middle-income countries',
+    'Upper-middle-income countries', 'International transport', 'International aviation', 'International shipping',
+    'Non-OECD (GCP)', 'OECD (GCP)', 'Middle East (GCP)', 'Asia (excl. China and India)', 'Europe (excl. EU-27)',
+]
+
+
+def country_names():
+    """Names of real countries, so that ISO resolution behaves as on the real data."""
+    import pycountry
+
+    return sorted(country.name for country in pycountry.countries)
+
+
+def generate(scale=1.0, seed=0, extra_columns=0, sectors=1):
+    """Build a DataFrame in the OWID CO2 schema with about ``scale`` x REAL_ROWS rows.
+
+    The entities are the real countries plus the usual aggregates. The
+    dataset grows by covering more years (always ending at LAST_YEAR), so
+    the number of distinct names stays realistic. ``extra_columns`` adds
+    unused numeric columns to mimic the width of the real file.
+    ``sectors`` > 1 splits every row into that many rows (e.g. emission
+    sectors) whose emissions add up to the original row, in shuffled order.
+    """
+    rng = np.random.default_rng(seed)
+    entities = np.array(AGGREGATES + country_names(), dtype=object)
+    n_years = math.ceil(scale * REAL_ROWS / len(entities))
+    years = np.arange(LAST_YEAR - n_years + 1, LAST_YEAR + 1)
+
+    country = np.repeat(entities, n_years)
+    year = np.tile(years, len(entities))
+
+    # Per-entity level and growth, with multiplicative noise per year
+    level = np.repeat(rng.lognormal(mean=2.0, sigma=2.0, size=len(entities)), n_years)
+    growth = np.repeat(rng.uniform(0.0, 0.03, size=len(entities)), n_years)
+    trend = np.exp(growth * np.clip(year - 1750, 0, 300))
+    co2 = level * trend * rng.lognormal(0.0, 0.1, size=len(country))
+    population = np.repeat(rng.lognormal(mean=15.0, sigma=2.0, size=len(entities)), n_years)
+    land_use_change_co2 = co2 * rng.uniform(0.0, 0.5, size=len(country))
+
+    data = pd.DataFrame({
+        'country': country,
+        'year': year,
+        'iso_code': '',
+        'population': population.round(),
+        'co2': co2,
+        'co2_per_capita': co2 * 1e6 / population,
+        'co2_including_luc': co2 + land_use_change_co2,
+        'land_use_change_co2': land_use_change_co2,
+    })
+    # Early years are missing for most entities, as in the real data
+    data.loc[rng.random(len(data)) < np.clip((1850 - year) / 100, 0, 0.9), 'co2'] = np.nan
+    for i in range(extra_columns):
+        data[f'extra_{i:02d}'] = rng.random(len(data))
+    if sectors > 1:
+        shares = rng.dirichlet(np.ones(sectors), size=len(data)).ravel()
+        data = data.loc[data.index.repeat(sectors)].reset_index(drop=True)
+        for column in ['co2', 'co2_per_capita', 'co2_including_luc', 'land_use_change_co2']:
+            data[column] *= shares
+        data = data.sample(frac=1.0, random_state=seed).reset_index(drop=True)
+    return data
+
+
+def write_csv(path, scale=1.0, seed=0, extra_columns=0, sectors=1):
+    data = generate(scale, seed, extra_columns, sectors)
+    data.to_csv(path, index=False)
+    return len(data)
@@ -0,0 +1,189 @@
+import atexit
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Set CO2VIZ_TIMINGS=1 (or pass --timings to python -m co2viz) to print the report at exit
+ENV_VAR = 'CO2VIZ_TIMINGS'
+
+# Set CO2VIZ_TRACE=<file> (or pass --trace <file>) to record spans and counters and write them at exit,
+# in the format named by CO2VIZ_TRACE_FORMAT: 'chrome' (default, for chrome://tracing or Perfetto) or 'json'
+TRACE_ENV_VAR = 'CO2VIZ_TRACE'
+TRACE_FORMAT_ENV_VAR = 'CO2VIZ_TRACE_FORMAT'
+TRACE_FORMATS = ['chrome', 'json']
+
+# Report order of the stage categories
+CATEGORIES = ['import', 'load', 'transform', 'chart']
+
+# (category, name, seconds) of every finished stage, in completion order
+stages = []
+
+# Trace events and counter totals, only filled while tracing
+events = []
+counters = Counter()
+
+_process_start = time.perf_counter()
+_enabled = False
+_tracing = False
+_events_lock = threading.Lock()
+# Time spent in nested stages, one accumulator per open stage (main thread only)
+_nested = [0.0]
+_no_span = contextlib.nullcontext()
+
+
+def _timestamp(seconds):
+    # Microseconds since co2viz was imported, as used by the Chrome trace format
+    return (seconds - _process_start) * 1e6
+
+
+def _add_span(category, name, start, end, args=None):
+    event = {
+        'name': name, 'cat': category, 'ph': 'X', 'ts': _timestamp(start), 'dur': (end - start) * 1e6,
+        'pid': os.getpid(), 'tid': threading.get_ident(),
+    }
+    if args:
+        event['args'] = args
+    with _events_lock:
+        events.append(event)
+
+
+@contextmanager
+def stage(category, name):
+    """Time the enclosed block as one stage of the startup report.
+
+    Nested stages are reported on their own and excluded from the
+    enclosing stage, so the categories add up to the total. While
+    tracing, every stage is also recorded as a span.
+    """
+    start = time.perf_counter()
+    _nested.append(0.0)
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        elapsed = end - start
+        nested = _nested.pop()
+        _nested[-1] += elapsed
+        stages.append((category, name, elapsed - nested))
+        if _tracing:
+            _add_span(category, name, start, end)
+
+
+@contextmanager
+def _span(category, name, args):
+    start = time.perf_counter()
+    try:
+        yield args
+    finally:
+        _add_span(category, name, start, time.perf_counter(), args)
+
+
+def span(name, category='co2viz', **args):
+    """Record the enclosed block as a trace span; a no-op unless tracing.
+
+    The context value is the span's ``args`` dict (None when not
+    tracing), to which details can be added before the block ends.
+    """
+    if not _tracing:
+        return _no_span
+    return _span(category, name, args)
+
+
+def count(name, value=1):
+    """Add ``value`` to a trace counter (rows scanned, points sent, cache hits, ...); a no-op unless tracing."""
+    if not _tracing:
+        return
+    with _events_lock:
+        counters[name] += value
+        events.append({
+            'name': name, 'ph': 'C', 'ts': _timestamp(time.perf_counter()),
+            'pid': os.getpid(), 'tid': threading.get_ident(), 'args': {name: counters[name]},
+        })
+
+
+def is_tracing():
+    return _tracing
+
+
+def report():
+    lines = [f"{'stage':<42}{'ms':>10}"]
+    for category in CATEGORIES + sorted({c for c, _, _ in stages} - set(CATEGORIES)):
+        entries = [(name, seconds) for c, name, seconds in stages if c == category]
+        if not entries:
+            continue
+        for name, seconds in entries:
+            lines.append(f"  {category + ': ' + name:<40}{seconds * 1000:>10.1f}")
+        lines.append(f"{category + ' total':<42}{sum(s for _, s in entries) * 1000:>10.1f}")
+    lines.append(f"{'wall time since co2viz import':<42}{(time.perf_counter() - _process_start) * 1000:>10.1f}")
+    return '\n'.join(lines)
+
+
+def print_report():
+    print(report())
+
+
+def is_enabled():
+    return _enabled
+
+
+def enable():
+    """Print the startup report when the interpreter exits."""
+    global _enabled
+    if not _enabled:
+        _enabled = True
+        atexit.register(print_report)
+
+
+def trace_data(trace_format='chrome'):
+    """The recorded spans and counters, as a Chrome trace or as plain JSON."""
+    with _events_lock:
+        recorded = list(events)
+        totals = dict(counters)
+    if trace_format == 'chrome':
+        return {'traceEvents': recorded, 'displayTimeUnit': 'ms', 'otherData': {'counters': totals}}
+    if trace_format == 'json':
+        return {
+            'spans': [
+                {'name': e['name'], 'category': e['cat'], 'start_ms': e['ts'] / 1000, 'duration_ms': e['dur'] / 1000,
+                 'thread': e['tid'], 'args': e.get('args', {})}
+                for e in recorded if e['ph'] == 'X'
+            ],
+            'counters': totals,
+            'stages': [{'category': c, 'name': n, 'ms': s * 1000} for c, n, s in stages],
+        }
+    raise ValueError(f'Unknown trace format {trace_format!r}, expected one of {TRACE_FORMATS}')
+
+
+def _plain(value):
+    # Span arguments may hold numpy scalars (years, counts)
+    return value.item() if hasattr(value, 'item') else str(value)
+
+
+def write_trace(path, trace_format='chrome'):
+    text = json.dumps(trace_data(trace_format), default=_plain)
+    with open(path, 'w') as f:
+        f.write(text)
+    print(f"Trace written to {path} ({len(events)} events)")
+
+
+def enable_trace(path, trace_format='chrome'):
+    """Record spans and counters from now on and write them to ``path`` when the interpreter exits.
+
+    Call before the chart backend is first created, so that its calls are traced too.
+    """
+    global _tracing
+    if trace_format not in TRACE_FORMATS:
+        raise ValueError(f'Unknown trace format {trace_format!r}, expected one of {TRACE_FORMATS}')
+    if not _tracing:
+        _tracing = True
+        atexit.register(write_trace, path, trace_format)
+
+
+if os.environ.get(ENV_VAR):
+    enable()
+if os.environ.get(TRACE_ENV_VAR):
+    enable_trace(os.environ[TRACE_ENV_VAR], os.environ.get(TRACE_FORMAT_ENV_VAR, 'chrome'))
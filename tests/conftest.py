@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+# Every chart in the tests is drawn by the recording backend, so no LightningChart install or license is needed
+os.environ.setdefault('CO2VIZ_BACKEND', 'recording')
+
+
+@pytest.fixture(scope='session')
+def dataset_path(tmp_path_factory):
+    """A small synthetic dataset in the OWID schema; its cache and ISO table live next to it."""
+    from co2viz.synthetic import write_csv
+
+    path = tmp_path_factory.mktemp('data') / 'owid-co2-data.csv'
+    write_csv(path, scale=0.05, seed=0)
+    return str(path)
+
+
+@pytest.fixture(scope='session')
+def data(dataset_path):
+    from co2viz.data import load_dataset
+
+    return load_dataset(dataset_path, report=False)
+
+
+@pytest.fixture(scope='session')
+def resolver(dataset_path, data):
+    from co2viz.iso import get_resolver
+
+    return get_resolver(data_path=dataset_path).build(data['country'].cat.categories)
+
+
+@pytest.fixture
+def store(data, resolver):
+    from co2viz.pivot import PivotStore
+
+    return PivotStore(data, metrics=('co2', 'co2_per_capita'), resolver=resolver)
+
+
+@pytest.fixture
+def recording():
+    """The recording backend, with its counts reset."""
+    from co2viz.backend import get_backend
+
+    backend = get_backend('recording')
+    backend.reset()
+    return backend
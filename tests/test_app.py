@@ -0,0 +1,25 @@
+import pytest
+
+from co2viz import app
+
+
+@pytest.mark.parametrize('argv', [
+    ['continent'],
+    ['region', '--no-animate'],
+    ['three-types'],
+    ['entities'],
+    ['map-years', '--years', '2020', '2022'],
+    ['map-per-capita', '--years', '2021', '2022'],
+    ['top-emitters', '--year', '2022'],
+    ['all'],
+])
+def test_views_run_on_the_recording_backend(dataset_path, recording, argv):
+    app.main(['--backend', 'recording', '--data', dataset_path] + argv)
+    assert sum(recording.calls.values()) > 0
+
+
+def test_views_reject_bad_arguments(dataset_path):
+    with pytest.raises(SystemExit):
+        app.main(['--backend', 'recording', '--data', dataset_path, 'map-years', '--palette', 'rainbow'])
+    with pytest.raises(SystemExit):
+        app.main(['--backend', 'recording', '--data', dataset_path, 'pie-chart'])
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from co2viz import app
+from co2viz.data import last_load, load_chunked, load_dataset
+from co2viz.synthetic import write_csv
+
+
+def by_key(frame):
+    return frame.astype({'country': str}).set_index(['country', 'year']).sort_index()
+
+
+def test_chunked_sector_load_matches_the_unsplit_dataset(tmp_path):
+    whole = str(tmp_path / 'whole.csv')
+    sectors = str(tmp_path / 'sectors.csv')
+    write_csv(whole, scale=0.02, seed=3)
+    write_csv(sectors, scale=0.02, seed=3, sectors=4)
+
+    expected = by_key(load_dataset(whole, report=False))
+    # Small chunks, so that partial aggregates are combined several times; per capita values of sectors add up
+    chunked = load_chunked(sectors, chunksize=97, aggregations={'co2_per_capita': 'sum'}, report=False)
+    assert last_load['rows_scanned'] == 4 * len(expected)
+    assert chunked['year'].dtype == np.int64
+    actual = by_key(chunked)
+
+    assert actual.index.equals(expected.index)
+    for column in actual.columns:
+        np.testing.assert_allclose(actual[column], expected[column], rtol=1e-9, equal_nan=True)
+
+
+def test_chunked_load_filters_entities_and_averages(tmp_path):
+    path = str(tmp_path / 'months.csv')
+    pd.DataFrame({
+        'country': ['France', 'France', 'Spain', 'France'],
+        'year': [2000, 2000, 2000, 2001],
+        'co2': [1.0, 2.0, 5.0, np.nan],
+        'co2_per_capita': [4.0, 6.0, 1.0, 3.0],
+    }).to_csv(path, index=False)
+    data = load_chunked(path, entities=['France'], chunksize=1, aggregations={'co2_per_capita': 'mean'}, report=False)
+    assert data['country'].tolist() == ['France', 'France']
+    np.testing.assert_array_equal(data['co2'], [3.0, np.nan])
+    np.testing.assert_array_equal(data['co2_per_capita'], [5.0, 3.0])
+
+
+def test_chunked_load_refuses_to_sum_per_capita_values(tmp_path):
+    path = str(tmp_path / 'sectors.csv')
+    write_csv(path, scale=0.01, seed=1, sectors=2)
+    with pytest.raises(ValueError, match='co2_per_capita'):
+        load_chunked(path, chunksize=50, report=False)
+    # Without the per capita column, or with one row per (country, year), nothing needs an aggregation
+    load_chunked(path, columns=['country', 'year', 'co2'], chunksize=50, report=False)
+    whole = str(tmp_path / 'whole.csv')
+    write_csv(whole, scale=0.01, seed=1)
+    load_chunked(whole, chunksize=50, report=False)
+
+
+def test_chunked_view_needs_an_aggregation_for_per_capita_values(tmp_path, recording, capsys):
+    path = str(tmp_path / 'owid-co2-data.csv')
+    write_csv(path, scale=0.01, seed=1, sectors=2)
+    argv = ['--backend', 'recording', '--data', path, '--chunksize', '100']
+    with pytest.raises(SystemExit):
+        app.main(argv + ['top-emitters'])
+    assert 'co2_per_capita cannot be summed' in capsys.readouterr().err
+    app.main(argv + ['--aggregate', 'co2_per_capita=sum', 'top-emitters'])
+    assert sum(recording.calls.values()) > 0
@@ -0,0 +1,65 @@
+import threading
+
+import pytest
+
+from co2viz import dashboard
+from co2viz.charts import map_years_dashboard
+from co2viz.dashboard import Panel, build_dashboard
+
+
+class ChartStub:
+    def __init__(self, kind, cell):
+        self.kind = kind
+        self.cell = cell
+        self.title = None
+
+    def set_title(self, title):
+        self.title = title
+
+
+class DashboardStub:
+    def MapChart(self, column_index, row_index):
+        return ChartStub('MapChart', (row_index, column_index))
+
+
+def panels(log):
+    def prepare(i):
+        log.append(('prepare', i, threading.current_thread()))
+        return i * 10
+
+    def commit(chart, payload):
+        log.append(('commit', payload, threading.current_thread()))
+    return [Panel('MapChart', i // 2, i % 2, f'panel {i}', lambda i=i: prepare(i), commit) for i in range(6)]
+
+
+@pytest.mark.parametrize('workers', [1, 3, None])
+def test_charts_are_created_and_filled_in_panel_order_on_the_calling_thread(workers):
+    log = []
+    charts = build_dashboard(DashboardStub(), panels(log), workers=workers)
+    assert [chart.cell for chart in charts] == [(i // 2, i % 2) for i in range(6)]
+    assert [chart.title for chart in charts] == [f'panel {i}' for i in range(6)]
+    commits = [entry for entry in log if entry[0] == 'commit']
+    assert [payload for _, payload, _ in commits] == [0, 10, 20, 30, 40, 50]
+    assert all(thread is threading.current_thread() for _, _, thread in commits)
+    prepare_threads = {thread for kind, _, thread in log if kind == 'prepare'}
+    if workers == 1:
+        assert prepare_threads == {threading.current_thread()}
+    else:
+        assert threading.current_thread() not in prepare_threads
+
+
+def test_last_build_reports_every_panel():
+    build_dashboard(DashboardStub(), panels([]), workers=2)
+    assert dashboard.last_build['workers'] == 2
+    assert [timing['title'] for timing in dashboard.last_build['panels']] == [f'panel {i}' for i in range(6)]
+    assert '6 panels' in dashboard.report()
+
+
+def test_map_dashboard_is_the_same_with_workers(data, store, recording):
+    years = store.years[-4:].tolist()
+    summaries = []
+    for workers in [1, 4]:
+        recording.reset()
+        map_years_dashboard(data, years, store=store, backend=recording, workers=workers)
+        summaries.append(recording.summary())
+    assert summaries[0] == summaries[1]
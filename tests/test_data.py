@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+
+from co2viz import app
+from co2viz.data import last_load, load_dataset
+from co2viz.synthetic import write_csv
+
+
+def test_second_load_uses_the_cache(tmp_path):
+    path = str(tmp_path / 'owid-co2-data.csv')
+    write_csv(path, scale=0.01)
+    first = load_dataset(path, report=False)
+    assert last_load['kind'] == 'cold'
+    second = load_dataset(path, report=False)
+    assert last_load['kind'] == 'warm'
+    pd.testing.assert_frame_equal(first, second)
+    assert isinstance(second['country'].dtype, pd.CategoricalDtype)
+
+
+def test_columns_missing_from_the_csv_are_left_out(tmp_path):
+    path = str(tmp_path / 'narrow.csv')
+    pd.DataFrame({'country': ['France', 'France'], 'year': [2000, 2001], 'co2': [1.0, 2.0]}).to_csv(path, index=False)
+    data = load_dataset(path, report=False)
+    assert list(data.columns) == ['country', 'year', 'co2']
+    load_dataset(path, report=False)
+    assert last_load['kind'] == 'warm'
+
+
+def test_view_needing_missing_columns_fails_clearly(tmp_path, capsys):
+    path = tmp_path / 'narrow.csv'
+    path.write_text('country,year,co2\nFrance,2000,1.0\n')
+    with pytest.raises(SystemExit):
+        app.main(['--backend', 'recording', '--data', str(path), 'three-types'])
+    assert 'co2_including_luc' in capsys.readouterr().err
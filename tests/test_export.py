@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+from co2viz import export
+from co2viz.charts import CHARTS
+from co2viz.recording import RecordingBackend
+
+
+@pytest.fixture
+def exported(monkeypatch):
+    calls = []
+    monkeypatch.setattr(export, 'export_charts', lambda names, *args: calls.append(names) or [])
+    return calls
+
+
+@pytest.mark.parametrize('argv, names', [
+    ([], list(CHARTS)),
+    (['--out', 'images'], list(CHARTS)),
+    (['all', '--format', 'jpeg'], list(CHARTS)),
+    (['continent', 'top_emitters'], ['continent', 'top_emitters']),
+])
+def test_export_chart_names(exported, argv, names):
+    export.main(argv)
+    assert exported == [names]
+
+
+def test_export_rejects_unknown_charts(exported):
+    with pytest.raises(SystemExit):
+        export.main(['continent', 'pie'])
+    assert exported == []
+
+
+class ScreenshotBackend(RecordingBackend):
+    """Recording backend that saves a fixed image, or nothing when ``image`` is empty."""
+
+    def __init__(self, image=b'\x89PNG\r\n\x1a\n'):
+        super().__init__()
+        self.image = image
+
+    def save_image(self, chart, file_name, image_format='image/png', downloads=None):
+        if self.image:
+            with open(file_name, 'wb') as f:
+                f.write(self.image)
+
+
+@pytest.mark.parametrize('name', list(CHARTS))
+def test_export_chart_saves_an_image(tmp_path, data, resolver, name):
+    result = export.export_chart(name, str(tmp_path), data=data, resolver=resolver, backend=ScreenshotBackend())
+    assert result['file'] == str(tmp_path / f'{name}.png')
+    assert os.path.getsize(result['file']) > 0
+
+
+def test_export_chart_fails_when_no_image_is_written(tmp_path, data, resolver):
+    with pytest.raises(RuntimeError, match='wrote no image'):
+        export.export_chart('continent', str(tmp_path), data=data, resolver=resolver, backend=ScreenshotBackend(b''))
+
+
+def test_export_refuses_the_recording_backend(tmp_path, dataset_path, monkeypatch, capsys):
+    monkeypatch.setenv('CO2VIZ_BACKEND', 'recording')
+    with pytest.raises(SystemExit):
+        export.main(['continent', '--data', dataset_path, '--out', str(tmp_path / 'images')])
+    assert 'cannot export' in capsys.readouterr().err
+    assert not (tmp_path / 'images').exists()
@@ -0,0 +1,54 @@
+import os
+
+import pandas as pd
+
+from co2viz import timing
+from co2viz.charts import CHARTS
+from co2viz.iso import IsoResolver, get_resolver, table_path_for
+
+
+def test_aggregates_are_unresolved(tmp_path):
+    resolver = IsoResolver(str(tmp_path / 'iso_a3.json'))
+    names = ['World', 'Africa', 'Africa (GCP)', 'High-income countries', 'International transport',
+             'France', 'Russia', "Cote d'Ivoire"]
+    resolver.build(names)
+    assert [resolver.table[name] for name in names] == [None, None, None, None, None, 'FRA', 'RUS', 'CIV']
+    assert 'World' in resolver.unresolved
+
+
+def test_resolve_categorical_and_object_columns(tmp_path):
+    resolver = IsoResolver(str(tmp_path / 'iso_a3.json'))
+    column = pd.Series(['France', 'World', None, 'France'])
+    for resolved in [resolver.resolve(column), resolver.resolve(column.astype('category'))]:
+        assert resolved.isna().tolist() == [False, True, True, False]
+        assert resolved.dropna().tolist() == ['FRA', 'FRA']
+    assert resolver.is_country(column).tolist() == [True, False, False, True]
+
+
+def test_table_is_persisted_and_reused(tmp_path):
+    path = str(tmp_path / 'iso_a3.json')
+    IsoResolver(path).build(['France', 'World'])
+    reloaded = IsoResolver(path).build(['France', 'World'])
+    assert reloaded.hits == 2 and reloaded.misses == 0
+    # Saved through a temporary file renamed over the table, which is not left behind
+    assert os.listdir(tmp_path) == ['iso_a3.json']
+
+
+def test_table_lives_next_to_the_dataset(tmp_path):
+    data_path = tmp_path / 'nested' / 'owid-co2-data.csv'
+    assert table_path_for(str(data_path)) == str(tmp_path / 'nested' / '.co2cache' / 'iso_a3.json')
+    assert get_resolver(data_path=str(data_path)) is get_resolver(table_path=table_path_for(str(data_path)))
+
+
+def test_charts_use_the_table_of_their_dataset(tmp_path, monkeypatch, data, resolver, recording):
+    monkeypatch.chdir(tmp_path)
+    for build in CHARTS.values():
+        build(data, backend=recording, resolver=resolver)
+    assert os.listdir(tmp_path) == []
+
+
+def test_pycountry_import_is_timed_once(tmp_path):
+    before = len(timing.stages)
+    IsoResolver(str(tmp_path / 'iso_a3.json')).build(['France', 'Germany', 'Spain', 'World', 'Atlantis'])
+    imports = [stage for stage in timing.stages[before:] if stage[:2] == ('import', 'pycountry')]
+    assert len(imports) <= 1
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from co2viz import app
+from co2viz.lod import MIN_PIXELS, Pyramid, downsample, lttb_indices, minmax_indices
+
+
+def series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.arange(n, dtype=np.float64), rng.normal(size=n).cumsum()
+
+
+def test_minmax_keeps_ends_and_extremes():
+    x, y = series(10_000)
+    y[1234], y[5678] = 1e6, -1e6
+    indices = minmax_indices(x, y, 100)
+    assert indices[0] == 0 and indices[-1] == len(x) - 1
+    assert 1234 in indices and 5678 in indices
+    assert len(indices) <= 2 * 100 + 2
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_minmax_returns_short_series_unchanged():
+    x, y = series(10)
+    np.testing.assert_array_equal(minmax_indices(x, y, 5), np.arange(10))
+
+
+def test_lttb_picks_threshold_points_in_order():
+    x, y = series(5_000)
+    indices = lttb_indices(x, y, 200)
+    assert len(indices) == 200
+    assert indices[0] == 0 and indices[-1] == len(x) - 1
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_downsample_rejects_unknown_methods():
+    x, y = series(10)
+    with pytest.raises(ValueError):
+        downsample(x, y, 4, 'nearest')
+
+
+@pytest.mark.parametrize('method', ['minmax', 'lttb'])
+def test_pyramid_levels_halve_down_to_pixels(method):
+    x, y = series(100_000)
+    pyramid = Pyramid(x, y, pixels=1000, method=method)
+    sizes = [len(level_x) for level_x, _ in pyramid.levels]
+    assert sizes[0] == len(x)
+    assert sizes[-1] <= 1000
+    assert all(later < earlier for earlier, later in zip(sizes, sizes[1:]))
+
+    level, visible_x, _ = pyramid.select(x[0], x[-1])
+    assert level > 0 and len(visible_x) <= 1000
+    level, visible_x, _ = pyramid.select(100.0, 600.0)
+    assert level == 0
+    assert visible_x[0] <= 100.0 and visible_x[-1] >= 600.0
+
+
+@pytest.mark.parametrize('method', ['minmax', 'lttb'])
+@pytest.mark.parametrize('n', range(0, 24))
+def test_pyramid_terminates_when_a_level_cannot_shrink(method, n):
+    # lttb keeps every point below 3 and minmax can keep 4 points of a single bucket
+    x, y = series(n)
+    pyramid = Pyramid(x, y, pixels=MIN_PIXELS, method=method)
+    sizes = [len(level_x) for level_x, _ in pyramid.levels]
+    assert all(later < earlier for earlier, later in zip(sizes, sizes[1:]))
+
+
+def test_pyramid_rejects_too_few_pixels():
+    x, y = series(3)
+    with pytest.raises(ValueError):
+        Pyramid(x, y, pixels=2)
+
+
+def test_entities_view_rejects_too_few_pixels(dataset_path):
+    with pytest.raises(SystemExit):
+        app.main(['--backend', 'recording', '--data', dataset_path, 'entities', '--pixels', '2'])
+
+
+@pytest.mark.parametrize('method', ['minmax', 'lttb'])
+def test_entities_view_runs_at_the_smallest_width(dataset_path, recording, method):
+    app.main(['--backend', 'recording', '--data', dataset_path, 'entities', '--pixels', str(MIN_PIXELS),
+              '--method', method])
+    assert sum(recording.calls.values()) > 0
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from co2viz.map_animation import MapAnimation
+from co2viz.palette import bucket_indices
+
+
+class MapChartStub:
+    def __init__(self):
+        self.payloads = []
+        self.titles = []
+
+    def invalidate_region_values(self, payload):
+        self.payloads.append(payload)
+
+    def set_title(self, title):
+        self.titles.append(title)
+
+
+def test_frames_send_only_changed_regions(store):
+    years = store.years.tolist()
+    chart = MapChartStub()
+    animation = MapAnimation(chart, store, 'co2', frame_rate=1e6, title='{year}')
+    animation.run()
+    assert chart.titles == [str(year) for year in years]
+
+    # Replaying the deltas gives the full map of every year
+    shown = {}
+    payloads = iter(chart.payloads)
+    for i, year in enumerate(years):
+        values = store.values(year, 'co2')
+        if i == 0 or not np.array_equal(values, store.values(years[i - 1], 'co2'), equal_nan=True):
+            shown.update((record['ISO_A3'], record['value']) for record in next(payloads))
+        expected = {code: value for code, value in zip(store.iso_codes.tolist(), values.tolist()) if value == value}
+        assert {code: value for code, value in shown.items() if value is not None} == expected
+    assert next(payloads, None) is None
+    assert animation.stats()['frames'] == len(years)
+
+
+def test_regions_missing_in_both_years_are_not_sent(store):
+    first, second = store.years[:2].tolist()
+    matrix = store.matrices['co2']
+    matrix[store._year_position[first], :] = np.nan
+    matrix[store._year_position[second], :] = np.nan
+    matrix[store._year_position[first], 0] = 1.0
+    matrix[store._year_position[second], 1] = 2.0
+    frames = list(MapAnimation(MapChartStub(), store, 'co2', years=[first, second]).frames())
+    assert frames[0][2].tolist() == [0]
+    # Region 0 disappeared (sent as missing) and region 1 appeared
+    assert frames[1][2].tolist() == [0, 1]
+
+
+def test_bucket_only_sends_regions_that_change_color(store):
+    breakpoints = [0.0, 10.0, 1000.0]
+    years = store.years.tolist()
+    frames = list(MapAnimation(MapChartStub(), store, 'co2', breakpoints=breakpoints, bucket_only=True).frames())
+    for (year, values, indices), previous in zip(frames[1:], years):
+        buckets = bucket_indices(breakpoints, values)
+        before = bucket_indices(breakpoints, store.values(previous, 'co2'))
+        assert indices.tolist() == np.flatnonzero(buckets != before).tolist()
+
+
+def test_bucket_only_needs_breakpoints(store):
+    with pytest.raises(ValueError):
+        MapAnimation(MapChartStub(), store, 'co2', bucket_only=True)
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from co2viz.palette import (MISSING_BUCKET, PaletteBuilder, bucket_indices, log_breakpoints, quantile_breakpoints,
+                            ramp_colors)
+
+
+def test_quantile_breakpoints_split_positive_values_evenly():
+    values = np.concatenate([np.arange(1.0, 1001.0), [0.0, -5.0, np.nan, np.inf]])
+    breakpoints = quantile_breakpoints(values, steps=5)
+    np.testing.assert_array_equal(breakpoints, [1.0, 250.0, 500.0, 750.0, 1000.0])
+    assert len(quantile_breakpoints(np.array([np.nan, 0.0]))) == 0
+
+
+def test_log_breakpoints_are_rounded_and_increasing():
+    breakpoints = log_breakpoints(np.array([1.0, 10.0, 2000.0]), steps=4)
+    np.testing.assert_array_equal(breakpoints, [1.0, 13.0, 160.0, 2000.0])
+    # Few distinct values give fewer breakpoints, never duplicates
+    assert log_breakpoints(np.array([3.0, 3.0]), steps=8).tolist() == [3.0]
+
+
+def test_bucket_indices():
+    buckets = bucket_indices([1.0, 10.0, 100.0], np.array([0.5, 1.0, 9.9, 10.0, 500.0, np.nan]))
+    assert buckets.tolist() == [-1, 0, 0, 1, 2, MISSING_BUCKET]
+
+
+def test_ramp_colors_run_from_the_first_to_the_last_color():
+    colors = ramp_colors(5, ['#000000', '#ffffff'])
+    assert colors == ['#000000', '#404040', '#808080', '#bfbfbf', '#ffffff']
+
+
+def test_palette_builder_caches_per_year_range(store):
+    palettes = PaletteBuilder(store, steps=8)
+    years = store.years.tolist()
+    steps = palettes.palette('co2', years[-5:])
+    assert palettes.palette('co2', [years[-1], years[-5]]) == steps
+    assert (palettes.hits, palettes.misses) == (1, 1)
+    values = [step['value'] for step in steps]
+    assert values == sorted(values) and len(steps) <= 8
+    assert all(step['color'].startswith('#') for step in steps)
+    buckets = palettes.buckets(store.values(years[-1], 'co2'), 'co2', years[-5:])
+    assert buckets.max() < len(steps)
+    with pytest.raises(ValueError):
+        palettes.breakpoints('co2', years, 'rainbow')
@@ -0,0 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from co2viz.payload import RecordEncoder, encoded_size, measure_allocations
+
+KEYS = np.array(['FRA', 'DEU', 'ESP', 'ITA'], dtype=object)
+VALUES = np.array([1.0, np.nan, 3.0, 4.0])
+
+
+def test_encode_all_indices_and_masks():
+    encoder = RecordEncoder(KEYS, 'ISO_A3')
+    assert encoder.encode(VALUES) == [
+        {'ISO_A3': 'FRA', 'value': 1.0}, {'ISO_A3': 'DEU', 'value': None},
+        {'ISO_A3': 'ESP', 'value': 3.0}, {'ISO_A3': 'ITA', 'value': 4.0},
+    ]
+    assert encoder.encode(VALUES, np.array([3, 0])) == [{'ISO_A3': 'ITA', 'value': 4.0}, {'ISO_A3': 'FRA', 'value': 1.0}]
+    assert encoder.encode(VALUES, ~np.isnan(VALUES)) == encoder.encode(VALUES, np.array([0, 2, 3]))
+    assert encoder.encode(VALUES, np.array([], dtype=np.intp)) == []
+
+
+def test_keys_are_shared_and_payloads_independent():
+    encoder = RecordEncoder(KEYS, 'category', missing=0.0)
+    first = encoder.encode(VALUES, np.array([0, 1]))
+    second = encoder.encode(VALUES * 10, np.array([0, 1]))
+    # The reused gather buffer does not leak into payloads already built
+    assert [record['category'] for record in first] == ['FRA', 'DEU']
+    assert [record['category'] for record in first] == [record['category'] for record in second]
+    assert [record['value'] for record in first] == [1.0, 0.0]
+    assert [record['value'] for record in second] == [10.0, 0.0]
+    assert first[0]['category'] is second[0]['category']
+
+
+def test_encode_is_thread_safe():
+    encoder = RecordEncoder(KEYS, 'ISO_A3')
+    frames = [VALUES * factor for factor in range(200)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        payloads = list(pool.map(lambda values: encoder.encode(values, np.array([3, 2, 0])), frames))
+    for factor, payload in enumerate(payloads):
+        assert [record['value'] for record in payload] == [4.0 * factor, 3.0 * factor, 1.0 * factor]
+
+
+def test_stats_and_sizes():
+    encoder = RecordEncoder(KEYS, 'ISO_A3')
+    payload = encoder.encode(VALUES)
+    size = encoder.measure(payload)
+    assert size == encoded_size(payload) > 0
+    stats = encoder.stats()
+    assert stats['payloads'] == 1 and stats['records_per_payload'] == 4 and stats['bytes_per_payload'] == size
+    result, blocks, allocated = measure_allocations(encoder.encode, VALUES)
+    assert result == payload and blocks > 0 and allocated > 0
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from co2viz import app
+from co2viz.ranking import RankingIndex
+
+
+def test_pivot_store_unknown_year_is_empty(store):
+    values = store.values(1500, 'co2')
+    assert len(values) == len(store.iso_codes)
+    assert np.isnan(values).all()
+    assert store.records(1500, 'co2') == []
+
+
+def test_unknown_year_has_an_empty_ranking(store):
+    ranking = RankingIndex(store, n=5)
+    assert len(ranking.top_indices(2100, 'co2')) == 0
+    assert ranking.bar_data(2100, 'co2') == []
+
+
+@pytest.mark.parametrize('argv', [
+    ['map-years', '--years', '2030', '--palette', 'quantile'],
+    ['map-per-capita', '--years', '1700', '2022', '--workers', '2'],
+    ['top-emitters', '--year', '2030'],
+])
+def test_views_draw_unknown_years_as_empty(dataset_path, recording, argv):
+    app.main(['--backend', 'recording', '--data', dataset_path] + argv)
+    assert sum(recording.calls.values()) > 0
@@ -0,0 +1,83 @@
+import time
+
+import numpy as np
+import pytest
+
+from co2viz.playback import Playback
+
+
+class LineSeriesStub:
+    def __init__(self):
+        self.years = []
+        self.clears = 0
+
+    def add(self, x, y):
+        assert len(x) == len(y)
+        self.years.extend(x)
+
+    def clear(self):
+        self.years = []
+        self.clears += 1
+
+
+SERIES = {
+    'World': (np.arange(2000, 2020, dtype=float), np.arange(20, dtype=float)),
+    'France': (np.arange(2010, 2020, dtype=float), np.arange(10, dtype=float)),
+}
+
+
+def playback(**rate):
+    lines = {entity: LineSeriesStub() for entity in SERIES}
+    return Playback(lines, SERIES, frame_rate=1000, **rate), lines
+
+
+def test_needs_exactly_one_rate():
+    for rate in [{}, {'years_per_second': 1, 'points_per_second': 1}]:
+        with pytest.raises(ValueError):
+            Playback({}, SERIES, **rate)
+
+
+@pytest.mark.parametrize('rate', [{'years_per_second': 1e6}, {'points_per_second': 1e6}])
+def test_play_sends_every_point_once_in_order(rate):
+    pb, lines = playback(**rate)
+    pb.run()
+    assert pb.finished and pb.current_year == 2019
+    assert lines['World'].years == SERIES['World'][0].tolist()
+    assert lines['France'].years == SERIES['France'][0].tolist()
+    assert pb.stats()['points'] == 30
+
+
+def test_rate_paces_the_frames():
+    pb, _ = playback(years_per_second=100)
+    start = time.perf_counter()
+    pb.run()
+    # 20 years at 100 years per second
+    assert time.perf_counter() - start >= 0.15
+    assert pb.stats()['frames'] > 1
+
+
+def test_pause_holds_the_position_until_resumed():
+    pb, lines = playback(years_per_second=50)
+    pb.pause()
+    pb.start()
+    time.sleep(0.1)
+    assert lines['World'].years == []
+    pb.resume()
+    pb.join(timeout=5)
+    assert pb.finished
+
+
+def test_seek_forward_and_back():
+    pb, lines = playback(years_per_second=1)
+    pb.seek(2012)
+    assert lines['World'].years == list(range(2000, 2013))
+    assert lines['France'].years == [2010, 2011, 2012]
+    pb.seek(2005)
+    assert lines['World'].clears == 1
+    assert lines['World'].years == list(range(2000, 2006))
+    assert lines['France'].years == []
+    assert pb.current_year == 2005
+    # Playing on continues from the sought year
+    pb.years_per_second = 1e6
+    pb.run()
+    assert lines['World'].years == SERIES['World'][0].tolist()
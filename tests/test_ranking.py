@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from co2viz import app
+from co2viz.backend import get_backend
+from co2viz.ranking import BarChartRace, RankingIndex
+
+
+@pytest.mark.parametrize('metric', ['co2', 'co2_per_capita'])
+def test_top_matches_a_full_sort(store, metric):
+    ranking = RankingIndex(store, n=10)
+    for year in store.years.tolist():
+        values = store.values(year, metric)
+        present = np.flatnonzero(~np.isnan(values))
+        expected = present[np.argsort(-values[present], kind='stable')][:10]
+        codes, top_values = ranking.top(year, metric)
+        np.testing.assert_array_equal(top_values, values[expected])
+        assert list(codes) == list(store.iso_codes[expected])
+        assert not np.isnan(top_values).any()
+
+
+def test_missing_values_never_rank(store):
+    year = store.years[-1]
+    matrix = store.matrices['co2']
+    row = store._year_position[year]
+    matrix[row, :] = np.nan
+    matrix[row, :3] = [3.0, 1.0, 2.0]
+    codes, values = RankingIndex(store, n=10).top(year, 'co2')
+    assert list(values) == [3.0, 2.0, 1.0]
+    assert list(codes) == list(store.iso_codes[[0, 2, 1]])
+
+
+def test_n_limits(store):
+    ranking = RankingIndex(store, n=5)
+    assert len(ranking.top_indices(store.years[-1], 'co2', 3)) == 3
+    with pytest.raises(ValueError):
+        ranking.top_indices(store.years[-1], 'co2', 6)
+    # An index over every country accepts any n
+    everything = RankingIndex(store, n=10_000)
+    assert everything.n == len(store.iso_codes)
+    assert len(everything.top_indices(store.years[-1], 'co2', 10_000)) <= len(store.iso_codes)
+
+
+def test_bar_chart_race_sends_every_year(store):
+    ranking = RankingIndex(store, n=5)
+    chart = get_backend('recording').bar_chart(vertical=False)
+    race = BarChartRace(chart, ranking, 'co2', frame_rate=1e6)
+    race.run()
+    assert race.stats()['frames'] == len(store.years)
+
+
+class BarChartStub:
+    def __init__(self):
+        self.frames = []
+
+    def set_data(self, data):
+        self.frames.append([bar['category'] for bar in data])
+
+
+def test_bar_chart_race_drops_countries_that_leave_the_ranking(store):
+    first, second = store.years[-2], store.years[-1]
+    matrix = store.matrices['co2']
+    matrix[store._year_position[first], :] = np.nan
+    matrix[store._year_position[second], :] = np.nan
+    matrix[store._year_position[first], :3] = [3.0, 2.0, 1.0]
+    matrix[store._year_position[second], 1:4] = [2.0, 1.0, 5.0]
+    chart = BarChartStub()
+    BarChartRace(chart, RankingIndex(store, n=3), 'co2', years=[first, second], frame_rate=1e6).run()
+    codes = store.iso_codes
+    assert chart.frames == [[codes[0], codes[1], codes[2]], [codes[3], codes[1], codes[2]]]
+
+
+def test_top_emitters_race_view(dataset_path, recording):
+    app.main(['--backend', 'recording', '--data', dataset_path, 'top-emitters', '--race', '--frame-rate', '1000000'])
+    assert sum(recording.calls.values()) > 0
@@ -0,0 +1,81 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from co2viz.data import cache_dir_for, load_dataset
+from co2viz.pivot import PivotStore
+from co2viz.refresh import diff_frames, refresh_dataset
+
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=['country', 'year', 'co2'])
+
+
+OLD = frame([
+    ('France', 2000, 10.0),
+    ('France', 2001, 11.0),
+    ('Germany', 2000, 20.0),
+    ('Germany', 2001, np.nan),
+    ('World', 2000, 100.0),
+])
+
+
+def test_diff_frames_finds_added_changed_and_removed_rows():
+    new = frame([
+        ('France', 2000, 10.0 * (1 + 1e-15)),  # CSV round-trip noise, not a change
+        ('France', 2001, 12.0),
+        ('Germany', 2001, np.nan),  # missing in both versions
+        ('World', 2000, 100.0),
+        ('Spain', 2001, 5.0),
+    ])
+    changes = diff_frames(OLD, new, ['co2'])
+
+    upserts = {(c, y): v for c, y, v in changes.upserts.itertuples(index=False)}
+    assert upserts == {('France', 2001): 12.0, ('Spain', 2001): 5.0}
+    assert changes.added_count == 1
+    assert list(changes.removed[['country', 'year']].itertuples(index=False, name=None)) == [('Germany', 2000)]
+    assert changes.removed['co2'].isna().all()
+    assert len(changes) == 3
+
+
+def test_diff_frames_of_equal_frames_is_empty():
+    assert len(diff_frames(OLD, OLD.copy(), ['co2'])) == 0
+
+
+def test_pivot_store_apply_patches_grows_and_clears(resolver):
+    store = PivotStore(OLD, metrics=('co2',), resolver=resolver)
+    assert list(store.iso_codes) == ['DEU', 'FRA']  # 'World' is an aggregate
+
+    new = frame([
+        ('France', 2000, 10.0),
+        ('France', 2001, 12.0),
+        ('Germany', 2001, np.nan),
+        ('World', 2000, 100.0),
+        ('Spain', 2002, 5.0),
+    ])
+    changed = store.apply(diff_frames(OLD, new, ['co2']))
+
+    assert list(store.iso_codes) == ['DEU', 'ESP', 'FRA']
+    assert list(store.years) == [2000, 2001, 2002]
+    assert changed['co2'] == {2001: ['FRA'], 2002: ['ESP'], 2000: ['DEU']}
+    np.testing.assert_array_equal(store.values(2000, 'co2'), [np.nan, np.nan, 10.0])
+    np.testing.assert_array_equal(store.values(2001, 'co2'), [np.nan, np.nan, 12.0])
+    np.testing.assert_array_equal(store.values(2002, 'co2'), [np.nan, 5.0, np.nan])
+
+
+def test_refresh_keeps_the_mapped_columns_of_the_previous_version(tmp_path):
+    path = str(tmp_path / 'owid-co2-data.csv')
+    OLD.to_csv(path, index=False)
+    old = load_dataset(path, report=False)
+    new = OLD.assign(co2=OLD['co2'] * 2)
+    new.to_csv(path, index=False)
+
+    data, changes = refresh_dataset(path, ['country', 'year', 'co2'])
+    # The session's memory-mapped columns still hold the old values, the reload the new ones
+    np.testing.assert_array_equal(old['co2'], OLD['co2'])
+    np.testing.assert_array_equal(data['co2'], new['co2'])
+    assert len(changes) == 4
+    np.testing.assert_array_equal(load_dataset(path, report=False)['co2'], data['co2'])
+    # Only the current version is left in the cache
+    assert len([entry for entry in os.listdir(cache_dir_for(path)) if entry != 'meta.json']) == 1
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from co2viz.regions import RegionAggregator, parse_region, parse_regions
+
+DATA = pd.DataFrame({
+    'country': pd.Categorical(['North America', 'North America', 'South America', 'South America', 'Europe']),
+    'year': [2000, 2001, 2000, 2001, 2000],
+    'co2': [10.0, np.nan, 5.0, np.nan, 7.0],
+    'co2_per_capita': [1.0, 2.0, 3.0, 4.0, 5.0],
+})
+
+
+def test_parse_region():
+    assert parse_region(' Americas = North America + South America ') == ('Americas', ['North America', 'South America'])
+    assert parse_regions({'G2': ('China', 'India')}) == {'G2': ['China', 'India']}
+    for text in ['Americas', '= North America', 'Americas = ']:
+        with pytest.raises(ValueError):
+            parse_region(text)
+
+
+def test_region_totals_sum_members_per_year():
+    regions = RegionAggregator(DATA, ['Americas = North America + South America', 'Nowhere = Atlantis'])
+    totals = regions.compute('co2')
+    americas = totals[totals['country'] == 'Americas']
+    assert americas['year'].tolist() == [2000, 2001]
+    # A year without any member value stays missing instead of becoming 0
+    np.testing.assert_array_equal(americas['co2'], [15.0, np.nan])
+    assert not (totals['country'] == 'Nowhere').any()
+
+
+def test_regions_are_computed_once_per_definition():
+    regions = RegionAggregator(DATA, ['Americas = North America + South America'])
+    first = regions.compute('co2', names=['Americas'])
+    assert regions.compute('co2', names=['Americas']).equals(first)
+    regions.define('Americas', ['North America'])
+    assert regions.compute('co2', names=['Americas'])['co2'].tolist()[0] == 10.0
+
+
+def test_non_additive_metrics_are_rejected():
+    with pytest.raises(ValueError, match='co2_per_capita'):
+        RegionAggregator(DATA).compute('co2_per_capita')
@@ -0,0 +1,102 @@
+import asyncio
+import json
+import re
+
+import pytest
+
+from co2viz import loadtest
+from co2viz.app import Session
+from co2viz.service import QueryService
+
+
+@pytest.fixture(scope='module')
+def service(dataset_path):
+    return QueryService(Session(dataset_path), cache_size=8, n=5)
+
+
+def get(service, target):
+    status, body = service.respond(target)
+    return status, json.loads(body)
+
+
+def test_queries(service):
+    status, meta = get(service, '/meta')
+    assert status == 200 and meta['top_n'] == 5
+    year = meta['years'][-1]
+    status, top = get(service, f'/top?year={year}&metric=co2&n=3')
+    assert status == 200 and len(top['countries']) == 3
+    values = [country['value'] for country in top['countries']]
+    assert values == sorted(values, reverse=True)
+    status, continents = get(service, '/continents?metric=co2')
+    assert status == 200 and 'Americas' in continents['series']
+    assert get(service, f'/map?year={year}')[0] == 200
+
+
+@pytest.mark.parametrize('target, status', [
+    ('/top?metric=co2', 400),
+    ('/top?year=abc', 400),
+    ('/top?year=2022&n=6', 400),
+    ('/map?year=2022&metric=gdp', 400),
+    ('/map?year=1000', 404),
+    ('/nowhere', 404),
+])
+def test_invalid_queries(service, target, status):
+    code, body = get(service, target)
+    assert code == status and body['error']
+
+
+def test_responses_are_cached(service):
+    before = service.cache.stats()['hits']
+    service.respond('/top?year=2022&n=2')
+    service.respond('/top?metric=co2&n=2&year=2022')
+    assert service.cache.stats()['hits'] == before + 1
+
+
+async def exchange(service, *requests):
+    """Send raw requests on one connection and return the raw response bytes."""
+    server = await asyncio.start_server(service.handle, '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        for request in requests:
+            writer.write(request)
+        await writer.drain()
+        writer.write_eof()
+        response = await reader.read()
+        writer.close()
+    return response
+
+
+def test_http_keeps_the_connection_alive(service):
+    response = asyncio.run(exchange(service, b'GET /meta HTTP/1.1\r\nHost: x\r\n\r\n',
+                                    b'POST /meta HTTP/1.1\r\nContent-Length: 2\r\n\r\n{}',
+                                    b'GET /nowhere HTTP/1.1\r\nConnection: close\r\n\r\n'))
+    assert re.findall(rb'HTTP/1\.1 (\d+)', response) == [b'200', b'405', b'404']
+
+
+@pytest.mark.parametrize('request_bytes', [
+    b'GET /meta HTTP/1.1\r\nContent-Length: abc\r\n\r\n',
+    b'GET /meta HTTP/1.1\r\nContent-Length: -5\r\n\r\n',
+    b'GARBAGE\r\n\r\n',
+])
+def test_http_bad_requests_answer_400_and_close(service, request_bytes):
+    response = asyncio.run(exchange(service, request_bytes, b'GET /meta HTTP/1.1\r\n\r\n'))
+    assert response.startswith(b'HTTP/1.1 400 Bad Request\r\n')
+    assert b'Connection: close' in response
+    assert response.count(b'HTTP/1.1 ') == 1
+
+
+def test_loadtest_against_the_service(service):
+    async def load():
+        server = await asyncio.start_server(service.handle, '127.0.0.1', 0)
+        async with server:
+            return await loadtest.run('127.0.0.1', server.sockets[0].getsockname()[1], requests=40, concurrency=4)
+    stats = asyncio.run(load())
+    assert stats['requests'] == 40 and stats['errors'] == 0
+    assert stats['p50_ms'] <= stats['p99_ms'] <= stats['max_ms']
+
+
+@pytest.mark.parametrize('argv', [['--requests', '1'], ['--requests', '0'], ['--concurrency', '0']])
+def test_loadtest_rejects_too_few_requests(argv):
+    with pytest.raises(SystemExit):
+        loadtest.main(argv)
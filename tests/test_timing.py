@@ -0,0 +1,61 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from co2viz import timing
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_spans_and_counters_are_no_ops_unless_tracing():
+    assert not timing.is_tracing()
+    events = len(timing.events)
+    with timing.span('frame', year=2000) as args:
+        assert args is None
+    timing.count('rows_scanned', 10)
+    assert len(timing.events) == events and 'rows_scanned' not in timing.counters
+
+
+def test_nested_stages_are_excluded_from_the_enclosing_one():
+    before = len(timing.stages)
+    with timing.stage('load', 'outer'):
+        with timing.stage('transform', 'inner'):
+            pass
+    (inner, outer) = timing.stages[before:]
+    assert inner[:2] == ('transform', 'inner') and outer[:2] == ('load', 'outer')
+    assert 'load: outer' in timing.report()
+
+
+def trace(tmp_path, dataset_path, trace_format):
+    path = tmp_path / f'trace.{trace_format}'
+    env = dict(os.environ, PYTHONPATH=ROOT, CO2VIZ_BACKEND='recording')
+    subprocess.run([sys.executable, '-m', 'co2viz', '--data', dataset_path, '--trace', str(path),
+                    '--trace-format', trace_format, 'continent'], check=True, env=env, capture_output=True)
+    return json.loads(path.read_text())
+
+
+def test_chrome_trace(tmp_path, dataset_path):
+    data = trace(tmp_path, dataset_path, 'chrome')
+    spans = [event for event in data['traceEvents'] if event['ph'] == 'X']
+    assert all({'name', 'cat', 'ts', 'dur', 'pid', 'tid'} <= set(event) for event in spans)
+    adds = [event for event in spans if event['name'] == 'LineSeries.add']
+    assert adds and all(event['args']['points'] > 0 for event in adds)
+    assert any(event['ph'] == 'C' and event['name'] == 'points_sent' for event in data['traceEvents'])
+    assert data['otherData']['counters']['points_sent'] == sum(event['args']['points'] for event in adds)
+    assert data['otherData']['counters']['rows_loaded'] > 0
+
+
+def test_json_trace(tmp_path, dataset_path):
+    data = trace(tmp_path, dataset_path, 'json')
+    assert {'spans', 'counters', 'stages'} <= set(data)
+    assert any(span['name'] == 'LineSeries.add' for span in data['spans'])
+    assert any(stage['category'] == 'load' for stage in data['stages'])
+
+
+def test_unknown_trace_format():
+    with pytest.raises(ValueError):
+        timing.enable_trace('trace.out', 'xml')
+    assert not timing.is_tracing()